@@ -0,0 +1,89 @@
+"""
+Import-time budget of the CLI and package entry points.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_imports --repeat 5
+
+Every module is imported in a fresh interpreter (best of --repeat runs) and
+checked against its time budget and the heavy dependencies it must not load.
+A last check runs the pipeline with include_charts=False on synthetic data
+and verifies the visualization stack stays unloaded. Exits with status 1 if
+any budget is exceeded.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'yfinance', 'matplotlib', 'seaborn', 'jinja2', 'scipy')
+
+# (module, budget in seconds, heavy modules it must not import)
+BUDGETS = [
+    ('main', 0.1, HEAVY_MODULES),
+    ('financial_portfolio_manager_analyzer.data_fetcher', 1.5, ('yfinance', 'matplotlib', 'seaborn', 'jinja2', 'scipy')),
+    ('financial_portfolio_manager_analyzer.pipeline', 1.5, ('yfinance', 'matplotlib', 'seaborn', 'jinja2', 'scipy')),
+    ('financial_portfolio_manager_analyzer.batch_runner', 1.5, ('yfinance', 'matplotlib', 'seaborn', 'jinja2', 'scipy')),
+    ('financial_portfolio_manager_analyzer.visualizer', 3.0, ('yfinance', 'seaborn', 'jinja2', 'scipy'))
+]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+NO_CHARTS_PROBE = """
+import json, logging, sys, tempfile
+logging.disable(logging.WARNING)
+from benchmarks.synthetic import synthetic_prices, synthetic_infos, install_local_source
+from financial_portfolio_manager_analyzer.pipeline import run_analysis
+prices = synthetic_prices(5, 300)
+assets = list(prices.columns[:-1])
+import financial_portfolio_manager_analyzer.report_generator as report_generator
+with tempfile.TemporaryDirectory(prefix='fpm_bench_') as directory:
+    install_local_source(prices, synthetic_infos(assets), directory)
+    report_generator.REPORTS_DIR = directory
+    run_analysis('Import Budget', assets, [1 / len(assets)] * len(assets), 5, 'retirement', data=prices[assets], include_charts=False)
+print(json.dumps({'loaded': [name for name in ('matplotlib', 'seaborn', 'yfinance') if name in sys.modules]}))
+"""
+
+
+def _probe(code):
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(module, repeat=5):
+    """
+    Best-of-`repeat` import time of `module` in fresh interpreters, and the heavy modules it loaded.
+    """
+    runs = [_probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return min(run['seconds'] for run in runs), runs[0]['loaded']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh-interpreter imports per module (the best one counts)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every time budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<52}{'Seconds':>9}{'Budget':>9}  Heavy modules loaded")
+    for module, budget, forbidden in BUDGETS:
+        seconds, loaded = measure(module, args.repeat)
+        unexpected = [name for name in loaded if name in forbidden]
+        over = seconds > budget * args.scale or unexpected
+        failed = failed or bool(over)
+        print(f"{module:<52}{seconds:>9.3f}{budget * args.scale:>9.2f}  {', '.join(loaded) or '-'}{'  FAIL' if over else ''}")
+
+    loaded = _probe(NO_CHARTS_PROBE)['loaded']
+    failed = failed or bool(loaded)
+    print(f"run_analysis(include_charts=False) loaded: {', '.join(loaded) or '-'}{'  FAIL' if loaded else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Time and peak memory of each stage of the analysis pipeline on synthetic data.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_pipeline --assets 10,50,200 --days 1260 --portfolios 1000
+
+Every stage runs against a LocalProvider through scratch caches, so no
+network access happens. Each stage is timed in one pass and its peak Python
+memory is measured with tracemalloc in a second pass, so tracing overhead
+does not distort the timings.
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from financial_portfolio_manager_analyzer.analysis_context import AnalysisContext
+from financial_portfolio_manager_analyzer.batch_analyzer import analyze_portfolios
+from financial_portfolio_manager_analyzer.data_fetcher import fetch_data, fetch_panel
+from financial_portfolio_manager_analyzer.portfolio_analyzer import calculate_performance, compare_to_benchmark, classify_investment_style, calculate_dynamic_risk_scores, calculate_portfolio_risk_score, analyze_diversification, monte_carlo_simulation
+from financial_portfolio_manager_analyzer.risk_metrics import calculate_risk_metrics
+from financial_portfolio_manager_analyzer.optimizer import optimize_portfolio
+from financial_portfolio_manager_analyzer.recommender import generate_recommendations
+from financial_portfolio_manager_analyzer.visualizer import create_cumulative_returns_plot, create_correlation_heatmap, create_style_exposure_pie, create_risk_gauge, create_monte_carlo_histogram
+from financial_portfolio_manager_analyzer.report_generator import generate_report
+
+from .synthetic import synthetic_prices, synthetic_infos, synthetic_weights, install_local_source
+
+
+def pipeline_stages(num_assets, num_days, num_portfolios, num_simulations, directory, seed=0):
+    """
+    Return [(stage name, callable)] mirroring main.main's pipeline. Stages
+    run in order and share state, like run_analysis does. Caches and the
+    report are written to the scratch `directory`.
+    """
+    prices = synthetic_prices(num_assets, num_days, seed=seed)
+    assets = list(prices.columns[:-1])
+    install_local_source(prices, synthetic_infos(assets, seed=seed), directory)
+    weights = list(synthetic_weights(1, num_assets, seed=seed)[0])
+    weight_matrix = synthetic_weights(num_portfolios, num_assets, seed=seed + 1)
+    start_date, end_date = prices.index[0], prices.index[-1] + pd.Timedelta(days=1)
+    state = {}
+
+    def fetch():
+        state['data'] = fetch_data(assets, start_date, end_date)
+
+    def panel():
+        fetch_panel(assets, start_date, end_date, dtype='float32')
+
+    def context():
+        state['context'] = AnalysisContext(state['data'])
+        state['context'].returns
+        state['context'].cov_matrix
+
+    def metadata():
+        state['styles'] = classify_investment_style(assets, context=state['context'])
+        state['risk_scores'] = calculate_dynamic_risk_scores(assets, context=state['context'], method='historical')
+        state['portfolio_risk_score'] = calculate_portfolio_risk_score(state['risk_scores'], weights)
+
+    def performance():
+        state['performance'] = calculate_performance(state['data'], weights, context=state['context'])
+
+    def benchmark():
+        state['comparison'] = compare_to_benchmark(state['data'], weights, context=state['context'])
+
+    def diversification():
+        state['diversification'] = analyze_diversification(state['data'], state['styles'], context=state['context'])
+
+    def risk_metrics():
+        state['risk_metrics'] = calculate_risk_metrics(state['data'], weights, context=state['context'])
+
+    def optimization():
+        state['optimization'] = optimize_portfolio(state['data'], weights, 5, context=state['context'], max_weight=max(0.4, 1 / num_assets))
+
+    def recommendations():
+        _, high_corr_pairs, style_correlations = state['diversification']
+        state['recommendations'], state['style_weights'] = generate_recommendations(5, state['performance']['volatility'], state['comparison']['benchmark_volatility'], high_corr_pairs, style_correlations, state['styles'], weights, 'retirement', assets, state['portfolio_risk_score'], context=state['context'], risk_metrics=state['risk_metrics'], optimization=state['optimization'])
+
+    def monte_carlo():
+        state['final_values'] = monte_carlo_simulation(state['data'], weights, num_simulations, context=state['context'], seed=seed)
+
+    def charts():
+        state['charts'] = {
+            'cumulative_returns': create_cumulative_returns_plot(state['data'], weights, context=state['context']),
+            'correlation_heatmap': create_correlation_heatmap(state['data'], context=state['context']),
+            'style_exposure': create_style_exposure_pie(state['style_weights']),
+            'risk_gauge': create_risk_gauge(state['portfolio_risk_score'], 5),
+            'monte_carlo': create_monte_carlo_histogram(state['final_values'])
+        }
+
+    def report():
+        correlation_matrix, high_corr_pairs, style_correlations = state['diversification']
+        generate_report('Benchmark Client', assets, weights, 5, 'retirement', state['performance'], state['comparison'], correlation_matrix, high_corr_pairs, style_correlations, state['style_weights'], state['risk_scores'], state['portfolio_risk_score'], state['recommendations'], state['final_values'], charts=state['charts'], reports_dir=directory, risk_metrics=state['risk_metrics'], optimization=state['optimization'])
+
+    def batch():
+        analyze_portfolios(state['data'], weight_matrix, state['risk_scores'], context=state['context'])
+
+    return [
+        ('fetch_data (cold cache)', fetch),
+        ('fetch_data (warm cache)', fetch),
+        ('fetch_panel float32 (warm cache)', panel),
+        ('returns and covariance', context),
+        ('styles and risk scores', metadata),
+        ('calculate_performance', performance),
+        ('compare_to_benchmark', benchmark),
+        ('analyze_diversification', diversification),
+        ('calculate_risk_metrics', risk_metrics),
+        ('optimize_portfolio', optimization),
+        ('generate_recommendations', recommendations),
+        ('monte_carlo_simulation', monte_carlo),
+        ('charts', charts),
+        ('generate_report', report),
+        (f'analyze_portfolios (P={num_portfolios})', batch)
+    ]
+
+
+def run_stages(stages, trace_memory=False):
+    results = []
+    for name, stage in stages:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stage()
+        seconds = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append((name, seconds, peak))
+    return results
+
+
+def benchmark(num_assets, num_days, num_portfolios, num_simulations, seed=0):
+    # A fresh scratch directory per pass, so the memory pass starts from cold caches too.
+    with tempfile.TemporaryDirectory(prefix='fpm_bench_') as directory:
+        timings = run_stages(pipeline_stages(num_assets, num_days, num_portfolios, num_simulations, directory, seed))
+    with tempfile.TemporaryDirectory(prefix='fpm_bench_') as directory:
+        memory = run_stages(pipeline_stages(num_assets, num_days, num_portfolios, num_simulations, directory, seed), trace_memory=True)
+    return [{'stage': name, 'assets': num_assets, 'days': num_days, 'seconds': seconds, 'peak_mb': peak / 2**20}
+            for (name, seconds, _), (_, _, peak) in zip(timings, memory)]
+
+
+def format_table(rows, sizes):
+    stages = list(dict.fromkeys(row['stage'] for row in rows))
+    by_key = {(row['stage'], row['assets']): row for row in rows}
+    header = f"{'Stage':<34}" + ''.join(f"{f'N={n} s':>12}{f'N={n} MB':>12}" for n in sizes)
+    lines = [header, '-' * len(header)]
+    for stage in stages:
+        cells = ''.join(f"{by_key[stage, n]['seconds']:>12.4f}{by_key[stage, n]['peak_mb']:>12.2f}" for n in sizes)
+        lines.append(f"{stage:<34}{cells}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--assets', default='10,50,100', help="Comma-separated asset counts (one scaling point each)")
+    parser.add_argument('--days', type=int, default=1260, help="Trading days of synthetic history")
+    parser.add_argument('--portfolios', type=int, default=1000, help="Weight vectors for the batch analysis stage")
+    parser.add_argument('--simulations', type=int, default=1000, help="Monte Carlo paths")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='FILE', help="Also write the raw measurements to this JSON file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sizes = [int(n) for n in args.assets.split(',')]
+    rows = []
+    for num_assets in sizes:
+        rows.extend(benchmark(num_assets, args.days, args.portfolios, args.simulations, args.seed))
+    print(format_table(rows, sizes))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from financial_portfolio_manager_analyzer.async_fetcher import LocalProvider, as_price_source, set_provider
+from financial_portfolio_manager_analyzer.metadata_cache import MetadataCache, set_metadata_cache
+from financial_portfolio_manager_analyzer.price_cache import PriceCache, set_price_cache
+
+SECTORS = ['Technology', 'Healthcare', 'Financial Services', 'Energy', 'Consumer Defensive', 'Utilities']
+
+
+def synthetic_prices(num_assets, num_days, benchmark='SPY', seed=0, end_date=None):
+    """
+    Daily prices for `num_assets` tickers plus the benchmark from a one-factor
+    model: each asset loads on a common market return with its own beta and
+    idiosyncratic noise.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    dates = pd.bdate_range(end=end_date, periods=num_days + 1)
+    market = rng.normal(0.0003, 0.011, num_days)
+    betas = rng.uniform(0.2, 1.8, num_assets)
+    idiosyncratic = rng.normal(0.0001, 0.012, (num_days, num_assets))
+    returns = np.column_stack([market[:, None] * betas + idiosyncratic, market])
+    prices = 100 * np.vstack([np.ones(num_assets + 1), np.cumprod(1 + returns, axis=0)])
+    tickers = [f"T{i:04d}" for i in range(num_assets)]
+    return pd.DataFrame(prices, index=dates, columns=tickers + [benchmark])
+
+
+def synthetic_infos(tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        ticker: {
+            'beta': float(rng.uniform(0.2, 1.8)),
+            'trailingPE': float(rng.uniform(5, 60)),
+            'dividendYield': float(rng.uniform(0, 0.06)),
+            'sector': SECTORS[rng.integers(len(SECTORS))]
+        }
+        for ticker in tickers
+    }
+
+
+def synthetic_weights(num_portfolios, num_assets, seed=0):
+    return np.random.default_rng(seed).dirichlet(np.ones(num_assets), num_portfolios)
+
+
+def install_local_source(prices, infos, directory):
+    """
+    Point data_fetcher at `prices` and `infos` through fresh caches in
+    `directory`, so no network access happens. The caller owns the
+    directory, e.g. a tempfile.TemporaryDirectory removed after the run.
+    """
+    provider = LocalProvider(prices, infos)
+    set_provider(provider)
+    set_price_cache(PriceCache(as_price_source(provider), directory))
+    metadata_cache = MetadataCache(directory)
+    for ticker, info in infos.items():
+        metadata_cache.put(ticker, info)
+    set_metadata_cache(metadata_cache)
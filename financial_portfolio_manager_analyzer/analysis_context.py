@@ -0,0 +1,97 @@
+import functools
+import numpy as np
+from .data_fetcher import fetch_benchmark_data, get_asset_infos
+from .price_panel import PricePanel
+
+class AnalysisContext:
+    """
+    Per-run view of a price DataFrame or PricePanel whose derived quantities
+    (returns, covariance, benchmark series, ...) are computed on first use and reused.
+
+    `returns` keeps only the days on which every asset has a price, as
+    portfolio return series need all constituents. The per-asset statistics
+    (mean_returns, cov_matrix, correlation_matrix) come from the pairwise-
+    complete return panel instead, so one late-listing asset does not cut
+    the history used for the others; the covariance is repaired to be
+    positive semi-definite and the correlations are derived from it.
+    `coverage` describes the two histories for reports.
+    """
+
+    def __init__(self, data, benchmark='SPY'):
+        if isinstance(data, PricePanel):
+            self.panel = data
+            data = data.to_frame()
+        self.data = data
+        self.benchmark = benchmark
+        self._memo = {}
+
+    @functools.cached_property
+    def panel(self):
+        return PricePanel.from_frame(self.data)
+
+    @functools.cached_property
+    def return_panel(self):
+        return self.panel.returns()
+
+    @functools.cached_property
+    def returns(self):
+        return self.data.pct_change().dropna()
+
+    @functools.cached_property
+    def log_returns(self):
+        return np.log1p(self.returns)
+
+    @functools.cached_property
+    def mean_returns(self):
+        return self.return_panel.mean()
+
+    @functools.cached_property
+    def cov_matrix(self):
+        return self.return_panel.cov(psd=True)
+
+    @functools.cached_property
+    def correlation_matrix(self):
+        return self.return_panel.corr(psd=True)
+
+    @functools.cached_property
+    def coverage(self):
+        """
+        Return days used by the portfolio series (`returns`, where every asset
+        has a price) and by the per-asset statistics (each asset's full history).
+        """
+        counts = self.return_panel.count()
+        return {
+            'common_start': self.returns.index[0].date() if len(self.returns) else None,
+            'common_days': len(self.returns),
+            'full_start': self.return_panel.first_valid_dates.min().date() if counts.any() else None,
+            'full_days': int(counts.max()) if len(counts) else 0,
+            'pairwise': bool(len(counts)) and int(counts.max()) > len(self.returns)
+        }
+
+    def memoize(self, key, compute):
+        """
+        Return the value cached under `key`, calling `compute()` the first time.
+        """
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def benchmark_data(self, benchmark=None):
+        benchmark = benchmark or self.benchmark
+        return self.memoize(('benchmark_data', benchmark), lambda: self._fetch_benchmark(benchmark))
+
+    def _fetch_benchmark(self, benchmark):
+        benchmark_data = fetch_benchmark_data(self.data.index[0], self.data.index[-1], benchmark)
+        if benchmark_data is None:
+            raise ValueError(f"No benchmark data available for {benchmark}.")
+        return benchmark_data
+
+    def benchmark_returns(self, benchmark=None):
+        benchmark = benchmark or self.benchmark
+        return self.memoize(('benchmark_returns', benchmark), lambda: self.benchmark_data(benchmark).pct_change().dropna())
+
+    def asset_infos(self, assets):
+        return self.memoize(('asset_infos', tuple(assets)), lambda: get_asset_infos(assets))
+
+def ensure_context(data, context=None):
+    return context if context is not None else AnalysisContext(data)
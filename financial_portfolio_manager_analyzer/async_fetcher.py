@@ -0,0 +1,205 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+
+class FetchError(Exception):
+    pass
+
+
+class NoDataError(FetchError):
+    """
+    Raised by providers when a symbol has no data; not retried.
+    """
+
+
+class FetchResult(namedtuple('FetchResult', ['key', 'value', 'error', 'attempts', 'seconds'])):
+    """
+    Outcome of one fetch: `value` on success, otherwise the final exception in `error`.
+    """
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def message(self):
+        return None if self.error is None else f"{type(self.error).__name__}: {self.error}"
+
+
+class LocalProvider:
+    """
+    Provider serving prices and asset info from memory, for tests and offline runs.
+
+    `prices` is a DataFrame indexed by date with one column per ticker and
+    `infos` a {ticker: info dict} mapping. `delay` (seconds) and `failures`
+    ({ticker: number of calls that raise before succeeding}) simulate a slow or
+    flaky upstream.
+    """
+
+    def __init__(self, prices, infos=None, delay=0, failures=None):
+        self.prices_frame = prices
+        self.infos = infos or {}
+        self.delay = delay
+        self.failures = dict(failures or {})
+
+    def _call(self, ticker):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.failures.get(ticker, 0) > 0:
+            self.failures[ticker] -= 1
+            raise ConnectionError(f"Simulated failure for {ticker}")
+
+    def prices(self, ticker, start_date, end_date):
+        self._call(ticker)
+        if ticker not in self.prices_frame.columns:
+            raise NoDataError(f"No price data for {ticker}")
+        series = self.prices_frame[ticker].dropna()
+        return series[(series.index >= pd.Timestamp(start_date)) & (series.index < pd.Timestamp(end_date))]
+
+    def info(self, ticker):
+        self._call(ticker)
+        return self.infos.get(ticker, {})
+
+
+_provider = None
+
+
+def _default_provider():
+    from .data_fetcher import YFinanceProvider
+    return YFinanceProvider()
+
+
+def get_provider():
+    """
+    The provider used when none is passed: the one installed with set_provider, else yfinance.
+    """
+    return _provider or _default_provider()
+
+
+def set_provider(provider):
+    """
+    Install the provider used when none is passed, e.g. a LocalProvider for offline runs.
+    """
+    global _provider
+    _provider = provider
+
+
+def run_sync(coroutine):
+    """
+    Run `coroutine` to completion from synchronous code and return its result.
+
+    asyncio.run cannot start inside a running event loop (e.g. when called
+    from a notebook or an async caller), so there it runs on a helper thread
+    with its own loop, blocking the caller until it finishes.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+async def _call_with_retries(key, call, semaphore, executor, timeout, retries, backoff):
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            async with semaphore:
+                if inspect.iscoroutinefunction(call):
+                    value = await asyncio.wait_for(call(), timeout)
+                else:
+                    # Timed-out provider calls keep running in their worker thread; only the wait is abandoned.
+                    value = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(executor, call), timeout)
+            return FetchResult(key, value, None, attempt, time.perf_counter() - start)
+        except Exception as e:
+            error = TimeoutError(f"no response within {timeout}s") if isinstance(e, asyncio.TimeoutError) else e
+            if isinstance(error, NoDataError) or attempt > retries:
+                result = FetchResult(key, None, error, attempt, time.perf_counter() - start)
+                logging.warning(f"Fetch of {key} failed after {attempt} attempt(s): {result.message}")
+                return result
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+
+
+async def _gather(keys, make_call, concurrency, timeout, retries, backoff):
+    semaphore = asyncio.Semaphore(concurrency)
+    # A private executor, shut down without waiting, so a hung call cannot block the caller past its timeout.
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        results = await asyncio.gather(*(_call_with_retries(key, make_call(key), semaphore, executor, timeout, retries, backoff) for key in keys))
+    finally:
+        executor.shutdown(wait=False)
+    return dict(zip(keys, results))
+
+
+async def fetch_prices_async(assets, start_date, end_date, provider=None, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Fetch price series for each asset concurrently. Returns {asset: FetchResult}.
+    """
+    provider = provider or get_provider()
+    assets = list(dict.fromkeys(assets))
+    return await _gather(assets, lambda asset: lambda: provider.prices(asset, start_date, end_date), concurrency, timeout, retries, backoff)
+
+
+async def fetch_benchmark_async(start_date, end_date, benchmark='SPY', provider=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    results = await fetch_prices_async([benchmark], start_date, end_date, provider, 1, timeout, retries, backoff)
+    return results[benchmark]
+
+
+async def fetch_infos_async(assets, provider=None, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Fetch asset info dicts concurrently. Returns {asset: FetchResult}.
+    """
+    provider = provider or get_provider()
+    assets = list(dict.fromkeys(assets))
+    return await _gather(assets, lambda asset: lambda: provider.info(asset), concurrency, timeout, retries, backoff)
+
+
+def fetch_all(assets, start_date, end_date, benchmark='SPY', provider=None, **options):
+    """
+    Synchronous wrapper fetching prices, benchmark and asset info in one event loop.
+
+    Returns a dict with 'prices' and 'infos' ({asset: FetchResult}) and
+    'benchmark' (a FetchResult).
+    """
+    async def run():
+        prices, benchmark_result, infos = await asyncio.gather(
+            fetch_prices_async(assets, start_date, end_date, provider, **options),
+            fetch_benchmark_async(start_date, end_date, benchmark, provider, **{k: v for k, v in options.items() if k != 'concurrency'}),
+            fetch_infos_async(assets, provider, **options)
+        )
+        return {'prices': prices, 'benchmark': benchmark_result, 'infos': infos}
+    return run_sync(run())
+
+
+def as_price_source(provider=None, **options):
+    """
+    Adapt a provider (default: the installed one, looked up on each call) into
+    a PriceCache source with bounded concurrency and retries.
+
+    Tickers that still fail are logged and left out of the returned frame; a
+    FetchError is raised when nothing was fetched because of errors other than
+    NoDataError (e.g. timeouts or connection failures).
+    """
+    def source(tickers, start_date, end_date):
+        results = run_sync(fetch_prices_async(tickers, start_date, end_date, provider, **options))
+        failed = {ticker: result.message for ticker, result in results.items() if not result.ok and not isinstance(result.error, NoDataError)}
+        if failed:
+            logging.error(f"Failed to fetch prices for {failed}")
+        series = {ticker: result.value for ticker, result in results.items() if result.ok and result.value is not None and len(result.value)}
+        if not series and failed:
+            raise FetchError(f"No prices fetched for {list(results)}: {failed}")
+        return pd.DataFrame(series)
+    return source
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from .analysis_context import ensure_context
+
+def _weight_matrix(weights, columns):
+    if isinstance(weights, pd.DataFrame):
+        unknown = [ticker for ticker in weights.columns if ticker not in columns]
+        if unknown:
+            raise ValueError(f"Weights given for tickers not in the price matrix: {unknown}")
+        return weights.index, weights.reindex(columns=columns, fill_value=0).to_numpy(dtype=float)
+    weight_matrix = np.atleast_2d(np.asarray(weights, dtype=float))
+    if weight_matrix.shape[1] != len(columns):
+        raise ValueError(f"Weight matrix has {weight_matrix.shape[1]} columns but the price matrix has {len(columns)} assets.")
+    return pd.RangeIndex(len(weight_matrix)), weight_matrix
+
+def analyze_portfolios(data, weights, risk_scores=None, benchmark='SPY', context=None):
+    """
+    Analyze many portfolios over one (union) price matrix in a single pass.
+
+    `weights` is a (P x N) array aligned with `data.columns`, or a DataFrame
+    with one row per portfolio and ticker columns (tickers of the price
+    matrix absent from it get zero weight; unknown tickers raise
+    ValueError). `risk_scores` is an optional {asset: score} dict as
+    returned by calculate_dynamic_risk_scores. Returns a DataFrame with one
+    row per portfolio whose return, volatility, Sharpe, risk score and
+    benchmark columns match calculate_performance,
+    calculate_portfolio_risk_score and compare_to_benchmark run on the same
+    price matrix.
+    """
+    context = ensure_context(data, context)
+    returns = context.returns
+    index, weight_matrix = _weight_matrix(weights, returns.columns)
+
+    portfolio_returns = returns.to_numpy() @ weight_matrix.T
+    num_days = len(portfolio_returns)
+    annualized_return = np.prod(1 + portfolio_returns, axis=0) ** (252 / num_days) - 1
+    volatility = portfolio_returns.std(axis=0, ddof=1) * np.sqrt(252)
+    result = pd.DataFrame({
+        'annualized_return': annualized_return,
+        'volatility': volatility,
+        'sharpe_ratio': (annualized_return - 0.02) / volatility
+    }, index=index)
+
+    if risk_scores is not None:
+        scores = pd.Series(risk_scores, dtype=float).reindex(returns.columns).to_numpy()
+        missing = np.isnan(scores)
+        portfolio_risk_score = np.round(weight_matrix @ np.where(missing, 0, scores), 2)
+        portfolio_risk_score[(weight_matrix[:, missing] != 0).any(axis=1)] = np.nan
+        result['risk_score'] = portfolio_risk_score
+
+    if benchmark is not None:
+        benchmark_returns = context.benchmark_returns(benchmark).iloc[:, 0]
+        result['benchmark_annualized_return'] = np.prod(1 + benchmark_returns.to_numpy()) ** (252 / len(benchmark_returns)) - 1
+        result['benchmark_volatility'] = benchmark_returns.std() * np.sqrt(252)
+
+        aligned = benchmark_returns.reindex(returns.index).to_numpy()
+        valid = ~np.isnan(aligned)
+        bench = aligned[valid] - aligned[valid].mean()
+        port = portfolio_returns[valid] - portfolio_returns[valid].mean(axis=0)
+        covariance = bench @ port / (len(bench) - 1)
+        result['beta'] = covariance / bench.var(ddof=1)
+        result['benchmark_correlation'] = covariance / (bench.std(ddof=1) * port.std(axis=0, ddof=1))
+        result['tracking_error'] = (port - bench[:, None]).std(axis=0, ddof=1) * np.sqrt(252)
+        result['excess_return'] = result['annualized_return'] - result['benchmark_annualized_return']
+
+    return result
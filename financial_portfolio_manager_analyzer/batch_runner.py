@@ -0,0 +1,108 @@
+import csv
+import functools
+import json
+import logging
+import os
+import re
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .data_fetcher import fetch_data, fetch_benchmark_data, get_asset_infos
+from .pipeline import validate_portfolio, run_analysis
+from . import instrumentation
+
+def _split(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [item for item in re.split(r'[,;\s]+', str(value)) if item]
+
+def load_clients(path):
+    """
+    Load client portfolios from a CSV or JSON file.
+
+    Each client has name, assets, weights, risk_tolerance and goals. In CSV
+    files assets and weights are lists separated by commas, semicolons or
+    spaces; JSON files hold a list of objects with the same keys. A record
+    that cannot be parsed does not stop the others: it is returned as a
+    client with only a name and an 'error', reported as failed by run_batch.
+    """
+    with open(path, newline='') as f:
+        if path.lower().endswith('.json'):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+
+    clients = []
+    for number, record in enumerate(records, 1):
+        try:
+            clients.append({
+                'name': str(record['name']).strip(),
+                'assets': [asset.strip().upper() for asset in _split(record['assets'])],
+                'weights': [float(w) for w in _split(record['weights'])],
+                'risk_tolerance': int(record['risk_tolerance']),
+                'goals': str(record['goals']).strip()
+            })
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            name = str(record.get('name') or '').strip() if isinstance(record, dict) else ''
+            error = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+            logging.error(f"Malformed client record {number} in {path}: {error}")
+            clients.append({'name': name or f"record {number}", 'error': f"Malformed client record {number}: {error}"})
+    return clients
+
+def _run_client(client, seed=None, **options):
+    start = time.perf_counter()
+    # Draw the seed here rather than in run_analysis so the summary can record it.
+    seed = np.random.SeedSequence().entropy if seed is None else seed
+    try:
+        if 'error' in client:
+            raise ValueError(client['error'])
+        validate_portfolio(client['assets'], client['weights'], client['risk_tolerance'])
+        report_path = run_analysis(client['name'], client['assets'], client['weights'], client['risk_tolerance'], client['goals'], seed=seed, **options)
+        result = {'name': client['name'], 'status': 'ok', 'seconds': time.perf_counter() - start, 'report_path': report_path, 'error': None, 'seed': seed}
+    except Exception as e:
+        logging.error(f"Analysis failed for {client['name']}: {e}")
+        result = {'name': client['name'], 'status': 'failed', 'seconds': time.perf_counter() - start, 'report_path': None, 'error': f"{type(e).__name__}: {e}", 'seed': seed}
+    if instrumentation.ENABLED:
+        # Worker processes exit without running atexit hooks, so hand the metrics back to the parent.
+        result['metrics'] = instrumentation.collect()
+        instrumentation.dump_profile()
+    return result
+
+def prefetch(clients, benchmark='SPY'):
+    """
+    Warm the price and metadata caches with the union of all client tickers.
+    """
+    tickers = list(dict.fromkeys(asset for client in clients if 'error' not in client for asset in client['assets']))
+    data = fetch_data(tickers)
+    if data is not None:
+        fetch_benchmark_data(data.index[0], data.index[-1], benchmark)
+    get_asset_infos(tickers)
+    return tickers
+
+def run_batch(clients, workers=None, **options):
+    """
+    Run the analysis pipeline for every client across a process pool and
+    return one summary record per client, in input order, including the
+    Monte Carlo seed used. `options` (e.g. seed) are passed on to
+    pipeline.run_analysis; without a seed each client gets a fresh one.
+    """
+    start = time.perf_counter()
+    tickers = prefetch(clients)
+    logging.info(f"Prefetched {len(tickers)} tickers in {time.perf_counter() - start:.2f}s")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=instrumentation.reset) as executor:
+        results = list(executor.map(functools.partial(_run_client, **options), clients))
+    for result in results:
+        if 'metrics' in result:
+            instrumentation.metrics.merge(result.pop('metrics'))
+    return results
+
+def format_summary(results):
+    lines = [f"{'Client':<30} {'Status':<8} {'Seconds':>8}  Detail"]
+    for result in results:
+        detail = result['report_path'] if result['status'] == 'ok' else result['error']
+        lines.append(f"{result['name'][:30]:<30} {result['status']:<8} {result['seconds']:>8.2f}  {detail}")
+    failed = sum(result['status'] != 'ok' for result in results)
+    total = sum(result['seconds'] for result in results)
+    lines.append(f"{len(results)} clients, {failed} failed, {total:.2f}s of client time")
+    return '\n'.join(lines)
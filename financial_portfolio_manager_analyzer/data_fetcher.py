@@ -1,37 +1,120 @@
-import yfinance as yf
 import datetime
+import json
 import logging
+import threading
+from .price_cache import PriceCache, get_price_cache, set_price_cache
+from .metadata_cache import get_metadata_cache
+from .async_fetcher import FetchError, NoDataError, as_price_source, fetch_infos_async, run_sync
+from .instrumentation import count, instrument
+
+def _yfinance():
+    # Imported on first use: it is slow to import and only needed when the caches miss.
+    import yfinance
+    return yfinance
+
+# yf.download collects results in module-level state, so concurrent calls can mix up each other's tickers.
+_download_lock = threading.Lock()
+
+@instrument
+def yfinance_source(assets, start_date, end_date):
+    """
+    Download historical adjusted closing prices from yfinance (price cache source).
+    """
+    with _download_lock:
+        data = _yfinance().download(list(assets), start=start_date, end=end_date, auto_adjust=False)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if data.empty:
+        return None
 
-def fetch_data(assets):
+    # Ensure 'Adj Close' column is present
+    if 'Adj Close' in data.columns:
+        return data['Adj Close']
+    else:
+        logging.warning("Warning: 'Adj Close' column is missing. Using 'Close' prices instead.")
+        return data['Close'] if 'Close' in data.columns else None
+
+class YFinanceProvider:
     """
-    Fetch historical adjusted closing prices for given assets.
+    Provider for async_fetcher backed by yfinance. Errors are raised, not swallowed,
+    so the async layer can retry them: unknown or delisted symbols raise
+    NoDataError, anything else (network errors, rate limits) a retryable FetchError.
     """
-    end_date = datetime.date.today()
-    start_date = end_date - datetime.timedelta(days=5 * 365)
+
+    def prices(self, ticker, start_date, end_date):
+        yf = _yfinance()
+        # Ticker.history keeps no shared module state, unlike yf.download (which calls it
+        # from its own threads), so tickers can be fetched concurrently without a lock.
+        try:
+            data = yf.Ticker(ticker).history(start=start_date, end=end_date, auto_adjust=False, raise_errors=True)
+        except (yf.exceptions.YFTzMissingError, yf.exceptions.YFPricesMissingError) as e:
+            raise NoDataError(f"No price data for {ticker} from {start_date} to {end_date}: {e}") from e
+        except Exception as e:
+            raise FetchError(f"Failed to download prices for {ticker}: {type(e).__name__}: {e}") from e
+        if data.empty:
+            raise NoDataError(f"No price data for {ticker} from {start_date} to {end_date}")
+        if 'Adj Close' in data.columns:
+            prices = data['Adj Close']
+        else:
+            logging.warning(f"Warning: 'Adj Close' column is missing for {ticker}. Using 'Close' prices instead.")
+            prices = data['Close']
+        # Dates in the exchange's time zone, as yf.download returns them.
+        return prices.set_axis(prices.index.tz_localize(None)).rename(ticker)
+
+    def info(self, ticker):
+        return _yfinance().Ticker(ticker).info or {}
+
+def _price_cache():
+    if get_price_cache() is None:
+        set_price_cache(PriceCache(as_price_source()))
+    return get_price_cache()
+
+@instrument
+def fetch_data(assets, start_date=None, end_date=None):
+    """
+    Fetch historical adjusted closing prices for given assets (default: the last 5 years).
+    """
+    end_date = end_date or datetime.date.today()
+    start_date = start_date or end_date - datetime.timedelta(days=5 * 365)
 
     logging.info(f"Fetching data for assets: {assets} from {start_date} to {end_date}")
 
     try:
-        data = yf.download(assets, start=start_date, end=end_date, auto_adjust=False)
+        data = _price_cache().get_prices(assets, start_date, end_date)
 
         if data.empty:
             logging.error("Error: No data retrieved. Please check stock symbols and API status.")
             return None
 
-        # Ensure 'Adj Close' column is present
-        if 'Adj Close' in data.columns:
-            return data['Adj Close']
-        else:
-            logging.warning("Warning: 'Adj Close' column is missing. Using 'Close' prices instead.")
-            return data['Close'] if 'Close' in data.columns else None
+        return data
 
     except Exception as e:
         logging.error(f"Failed to fetch data: {e}")
         return None
 
+@instrument
+def fetch_panel(assets, start_date=None, end_date=None, dtype='float64'):
+    """
+    Fetch historical adjusted closing prices as a PricePanel (optionally float32),
+    with missing days kept as NaN rather than dropped (default: the last 5 years).
+    """
+    end_date = end_date or datetime.date.today()
+    start_date = start_date or end_date - datetime.timedelta(days=5 * 365)
+
+    logging.info(f"Fetching price panel for assets: {assets} from {start_date} to {end_date}")
+
+    try:
+        panel = _price_cache().get_panel(assets, start_date, end_date, dtype=dtype)
+
+        if panel is None:
+            logging.error("Error: No data retrieved. Please check stock symbols and API status.")
+
+        return panel
+
+    except Exception as e:
+        logging.error(f"Failed to fetch data: {e}")
+        return None
+
+@instrument
 def fetch_benchmark_data(start_date, end_date, benchmark='SPY'):
     """
     Fetch historical adjusted closing prices for a benchmark index (default: SPY).
@@ -39,33 +122,53 @@ def fetch_benchmark_data(start_date, end_date, benchmark='SPY'):
     logging.info(f"Fetching benchmark data for {benchmark} from {start_date} to {end_date}")
 
     try:
-        benchmark_data = yf.download(benchmark, start=start_date, end=end_date, auto_adjust=False)
+        benchmark_data = _price_cache().get_prices([benchmark], start_date, end_date)
 
         if benchmark_data.empty:
             logging.error("Error: No benchmark data retrieved. Check the symbol.")
             return None
 
-        return benchmark_data['Adj Close'] if 'Adj Close' in benchmark_data.columns else benchmark_data['Close']
+        return benchmark_data
 
     except Exception as e:
         logging.error(f"Failed to fetch benchmark data: {e}")
         return None
 
+@instrument
+def get_asset_infos(assets, max_workers=8):
+    """
+    Fetch company information for several assets, serving cached entries and
+    fetching the rest concurrently through the installed async_fetcher
+    provider, with its timeouts and retries. Assets whose fetch fails get an
+    empty dict. Returns a dict keyed by asset.
+    """
+    cache = get_metadata_cache()
+    infos = {}
+    missing = []
+    for asset in dict.fromkeys(assets):
+        info = cache.get(asset)
+        if info is None:
+            missing.append(asset)
+        else:
+            infos[asset] = info
+    count('cache_hits', len(infos), cache='metadata')
+    count('cache_misses', len(missing), cache='metadata')
+
+    if missing:
+        logging.info(f"Fetching asset info for {missing}")
+        for asset, result in run_sync(fetch_infos_async(missing, concurrency=max_workers)).items():
+            info = result.value if result.ok else {}
+            if info:
+                count('bytes_fetched', len(json.dumps(info, default=str)), source='metadata')
+                cache.put(asset, info)
+            elif result.ok:
+                logging.warning(f"Warning: No information found for {asset}")
+            infos[asset] = info or {}
+
+    return {asset: infos[asset] for asset in assets}
+
 def get_asset_info(asset):
     """
     Fetch company information for a given asset.
     """
-    logging.info(f"Fetching asset info for {asset}")
-
-    try:
-        ticker = yf.Ticker(asset)
-        info = ticker.info
-
-        if not info:
-            logging.warning(f"Warning: No information found for {asset}")
-            return {}
-
-        return info
-    except Exception as e:
-        logging.error(f"Failed to fetch asset info for {asset}: {e}")
-        return {}
\ No newline at end of file
+    return get_asset_infos([asset])[asset]
@@ -0,0 +1,172 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get('FPM_INSTRUMENT', '').lower() not in ('', '0', 'false', 'no')
+METRICS_FILE = os.environ.get('FPM_METRICS_FILE')
+PROFILE_FILE = os.environ.get('FPM_PROFILE_FILE')
+
+COUNTER_HELP = {
+    'cache_hits': "Tickers served from a cache without fetching.",
+    'cache_misses': "Tickers that had to be fetched (fully or their missing tail).",
+    'bytes_fetched': "Bytes of price data and asset info received from the data source."
+}
+
+
+def _label_text(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+class Metrics:
+    """
+    Thread-safe registry of wall time and call counts per instrumented
+    function, plus named counters (cache hits/misses, bytes fetched) with labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            calls, total, longest = self.timings.get(name, (0, 0.0, 0.0))
+            self.timings[name] = (calls + 1, total + seconds, max(longest, seconds))
+
+    def add(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        """
+        Plain-dict copy of the metrics, as written by to_json and accepted by merge.
+        """
+        with self._lock:
+            return {
+                'functions': {name: {'calls': calls, 'seconds': total, 'max_seconds': longest} for name, (calls, total, longest) in sorted(self.timings.items())},
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(self.counters.items())]
+            }
+
+    def merge(self, snapshot):
+        """
+        Add a snapshot taken elsewhere, e.g. in a batch worker process.
+        """
+        with self._lock:
+            for name, timing in snapshot['functions'].items():
+                calls, total, longest = self.timings.get(name, (0, 0.0, 0.0))
+                self.timings[name] = (calls + timing['calls'], total + timing['seconds'], max(longest, timing['max_seconds']))
+            for counter in snapshot['counters']:
+                key = (counter['name'], tuple(sorted(counter['labels'].items())))
+                self.counters[key] = self.counters.get(key, 0) + counter['value']
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Prometheus text exposition format, with `stage` (module) and `function` labels.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for metric, kind, field, help_text in [
+            ('fpm_function_calls_total', 'counter', 'calls', "Calls of each instrumented function."),
+            ('fpm_function_seconds_total', 'counter', 'seconds', "Wall time spent in each instrumented function, including nested instrumented calls."),
+            ('fpm_function_max_seconds', 'gauge', 'max_seconds', "Longest single call of each instrumented function.")
+        ]:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for name, timing in snapshot['functions'].items():
+                stage, function = name.rsplit('.', 1)
+                lines.append(f"{metric}{{{_label_text([('stage', stage), ('function', function)])}}} {timing[field]}")
+        for name in dict.fromkeys(counter['name'] for counter in snapshot['counters']):
+            metric = f"fpm_{name}_total"
+            lines += [f"# HELP {metric} {COUNTER_HELP.get(name, name)}", f"# TYPE {metric} counter"]
+            for counter in snapshot['counters']:
+                if counter['name'] == name:
+                    lines.append(f"{metric}{{{_label_text(sorted(counter['labels'].items()))}}} {counter['value']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """
+        Write the metrics to `path`: JSON for a .json file, Prometheus text otherwise.
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_json() if path.lower().endswith('.json') else self.to_prometheus())
+
+
+metrics = Metrics()
+_profiler = None
+
+
+def instrument(func):
+    """
+    Record the wall time and call count of `func` under '<module>.<function>'.
+    Returns `func` itself when instrumentation is off, so there is no overhead.
+    """
+    if not ENABLED:
+        return func
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe(name, time.perf_counter() - start)
+    return wrapper
+
+
+def count(name, value=1, **labels):
+    """
+    Add `value` to the counter `name` with the given labels if instrumentation is on.
+    """
+    if ENABLED:
+        metrics.add(name, value, **labels)
+
+
+def reset():
+    """
+    Discard the metrics recorded so far, e.g. those a forked worker inherited.
+    """
+    metrics.reset()
+
+
+def collect():
+    """
+    Return a snapshot of the metrics and start over, e.g. at the end of a batch worker's task.
+    """
+    snapshot = metrics.snapshot()
+    metrics.reset()
+    return snapshot
+
+
+def dump_profile():
+    """
+    Write the cProfile statistics gathered so far to FPM_PROFILE_FILE
+    ('{pid}' in the name is replaced by the process id).
+    """
+    if _profiler is not None:
+        _profiler.dump_stats(PROFILE_FILE.replace('{pid}', str(os.getpid())))
+
+
+def _write_exports():
+    if METRICS_FILE:
+        metrics.write(METRICS_FILE)
+    dump_profile()
+
+
+if ENABLED:
+    if PROFILE_FILE:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(_write_exports)
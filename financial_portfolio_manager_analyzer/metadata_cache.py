@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .price_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAXSIZE = 1024
+
+
+class MetadataCache:
+    """
+    In-memory LRU of asset info dicts backed by one JSON file per ticker on disk.
+
+    Entries older than `ttl` seconds are treated as missing in both layers.
+    """
+
+    def __init__(self, directory=None, ttl=DEFAULT_TTL, maxsize=DEFAULT_MAXSIZE):
+        self.directory = os.path.join(directory or DEFAULT_CACHE_DIR, 'metadata')
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.directory, ticker.replace('/', '_') + '.json')
+
+    def _remember(self, ticker, entry):
+        with self._lock:
+            self._entries[ticker] = entry
+            self._entries.move_to_end(ticker)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None:
+                self._entries.move_to_end(ticker)
+        if entry is None:
+            try:
+                with open(self._path(ticker)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._remember(ticker, entry)
+        if time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        return entry['info']
+
+    def put(self, ticker, info):
+        entry = {'fetched_at': time.time(), 'info': info}
+        self._remember(ticker, entry)
+        path = self._path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+_metadata_cache = None
+
+
+def get_metadata_cache():
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = MetadataCache()
+    return _metadata_cache
+
+
+def set_metadata_cache(cache):
+    global _metadata_cache
+    _metadata_cache = cache
@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 4096
+
+def _simulate_chunk(args):
+    mean, std, num_days, size, seed_sequence = args
+    rng = np.random.default_rng(seed_sequence)
+    daily_returns = rng.normal(mean, std, (num_days, size))
+    return np.prod(1 + daily_returns, axis=0)
+
+def run_monte_carlo(mean_returns, cov_matrix, weights, num_simulations=1000, num_days=252, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Simulate final portfolio values (starting at 1.0) for `num_simulations` paths.
+
+    Asset returns are multivariate normal, so the portfolio's daily return is
+    itself normal with mean w.mu and variance w'Sigma w; paths are drawn from
+    that one-dimensional distribution, chunk by chunk, so memory is bounded by
+    num_days x chunk_size regardless of the number of assets. Each chunk gets
+    its own child of SeedSequence(seed), so a given seed and chunk_size give
+    the same values whatever the number of `workers` (a process pool is used
+    when workers > 1). Returns (final_values, seed_entropy).
+    """
+    weights = np.asarray(weights, dtype=float)
+    mean = float(np.dot(np.asarray(mean_returns, dtype=float), weights))
+    std = float(np.sqrt(max(weights @ np.asarray(cov_matrix, dtype=float) @ weights, 0)))
+
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, num_simulations - start) for start in range(0, num_simulations, chunk_size)]
+    tasks = [(mean, std, num_days, size, child) for size, child in zip(sizes, seed_sequence.spawn(len(sizes)))]
+
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            final_values = np.concatenate(list(executor.map(_simulate_chunk, tasks)))
+    else:
+        final_values = np.concatenate([_simulate_chunk(task) for task in tasks])
+    return final_values, seed_sequence.entropy
+
+def summarize_simulation(final_values, percentiles=(5, 25, 50, 75, 95), confidence=0.95):
+    """
+    Summary statistics of simulated final values, with VaR and CVaR expressed
+    as a loss fraction of the starting value at the given confidence level.
+    """
+    final_values = np.asarray(final_values)
+    cutoff = np.percentile(final_values, (1 - confidence) * 100)
+    return {
+        'mean': float(final_values.mean()),
+        'std': float(final_values.std()),
+        'percentiles': dict(zip(percentiles, np.percentile(final_values, percentiles).tolist())),
+        'var': float(1 - cutoff),
+        'cvar': float(1 - final_values[final_values <= cutoff].mean()),
+        'confidence': confidence
+    }
@@ -0,0 +1,215 @@
+import logging
+import numpy as np
+import pandas as pd
+from .analysis_context import ensure_context
+from .instrumentation import instrument
+
+# Below this (annualized) volatility a portfolio is treated as riskless and gets no Sharpe ratio.
+MIN_VOLATILITY = 1e-8
+
+def _solve_qp(cov, linear, weights, max_weight=None, tol=1e-12, max_iter=1000):
+    """
+    Minimize w'Cw - linear'w over long-only, fully invested w (each w_i <=
+    max_weight if given) by a primal active-set method started from the
+    feasible `weights`, so a nearby previous solution makes it converge in a
+    few iterations. C may be singular (e.g. a zero-variance asset).
+    """
+    upper = 1.0 if max_weight is None else max_weight
+    # A tiny ridge keeps the step solves well-posed for a singular C; the optimality
+    # check below uses the true gradient, so the solution is still that of C.
+    ridge = 1e-10 * max(np.diag(cov).max(initial=0), 1e-12) * np.eye(len(cov))
+    weights = weights.copy()
+    at_lower = weights <= tol
+    at_upper = (weights >= upper - tol) & ~at_lower if max_weight is not None else np.zeros(len(weights), dtype=bool)
+    for _ in range(max_iter):
+        free = ~(at_lower | at_upper)
+        gradient = 2 * cov @ weights - linear
+        step = np.zeros(free.sum())
+        if free.any():
+            # Equality-constrained step on the free assets: 2 C_FF p + g_F = nu * 1 with sum(p) = 0.
+            solved = np.linalg.solve(2 * (cov + ridge)[np.ix_(free, free)], np.column_stack([gradient[free], np.ones(free.sum())]))
+            multiplier = solved[:, 0].sum() / solved[:, 1].sum()
+            step = multiplier * solved[:, 1] - solved[:, 0]
+        if np.abs(step).max(initial=0) <= tol:
+            if not free.any():
+                multiplier = (gradient[at_lower].min(initial=np.inf) + gradient[at_upper].max(initial=-np.inf)) / 2
+            violation = np.where(at_lower, gradient - multiplier, np.where(at_upper, multiplier - gradient, 0))
+            worst = violation.argmin()
+            if violation[worst] >= -tol * max(1.0, np.abs(gradient).max()):
+                return weights
+            at_lower[worst] = at_upper[worst] = False
+            continue
+
+        # Move as far along the step as the bounds allow and hold the first bound it hits.
+        free_index = np.flatnonzero(free)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(step < 0, weights[free] / -step, np.where(step > 0, (upper - weights[free]) / step, np.inf))
+        blocking = ratios.argmin()
+        if ratios[blocking] >= 1:
+            weights[free] += step
+            continue
+        weights[free] += ratios[blocking] * step
+        index = free_index[blocking]
+        if step[blocking] < 0:
+            weights[index] = 0.0
+            at_lower[index] = True
+        else:
+            weights[index] = upper
+            at_upper[index] = True
+    return weights
+
+def _check_max_weight(num_assets, max_weight):
+    if max_weight is not None and max_weight * num_assets < 1:
+        raise ValueError(f"max_weight {max_weight} is too small to invest fully in {num_assets} assets.")
+
+def minimum_variance_weights(cov_matrix, max_weight=None):
+    """
+    Long-only weights (optionally capped at `max_weight`) with the lowest variance.
+    """
+    cov = np.asarray(cov_matrix, dtype=float)
+    _check_max_weight(len(cov), max_weight)
+    weights = _solve_qp(cov, np.zeros(len(cov)), np.full(len(cov), 1 / len(cov)), max_weight)
+    return pd.Series(weights, index=getattr(cov_matrix, 'columns', None))
+
+def risk_parity_weights(cov_matrix, tol=1e-10, max_iter=100):
+    """
+    Long-only weights whose assets contribute equally to portfolio variance,
+    by Newton's method on 0.5 y'Cy - sum(log y) (then w = y / sum(y)).
+    Zero-variance assets contribute no risk at any weight and get weight 0
+    (equal weights if every asset has zero variance).
+    """
+    assets = getattr(cov_matrix, 'columns', None)
+    cov = np.asarray(cov_matrix, dtype=float)
+    variance = np.diag(cov)
+    risky = variance > 1e-12 * variance.max(initial=0)
+    if not risky.all():
+        logging.warning(f"Risk parity leaves out {int((~risky).sum())} zero-variance asset(s).")
+        weights = np.zeros(len(cov))
+        if risky.any():
+            weights[risky] = risk_parity_weights(cov[np.ix_(risky, risky)], tol, max_iter).to_numpy()
+        else:
+            weights[:] = 1 / len(cov)
+        return pd.Series(weights, index=assets)
+    y = 1 / np.sqrt(variance)
+    for _ in range(max_iter):
+        gradient = cov @ y - 1 / y
+        newton_step = np.linalg.solve(cov + np.diag(1 / y ** 2), gradient)
+        # Damp the step so y stays positive.
+        shrink = newton_step > 0
+        scale = min(1.0, 0.9 * (y[shrink] / newton_step[shrink]).min()) if shrink.any() else 1.0
+        y = y - scale * newton_step
+        if np.abs(gradient * y).max() < tol:
+            break
+    return pd.Series(y / y.sum(), index=assets)
+
+def _max_return_tradeoff(mean, cov, max_weight=None):
+    # Smallest tradeoff t at which the maximum-return portfolio (the highest-mean assets
+    # filled up to max_weight) satisfies the optimality conditions, i.e. where the frontier ends.
+    upper = 1.0 if max_weight is None else max_weight
+    corner = np.zeros(len(mean))
+    remaining = 1.0
+    for index in np.argsort(-mean, kind='stable'):
+        corner[index] = min(upper, remaining)
+        remaining -= corner[index]
+        if remaining <= 0:
+            break
+    curvature = 2 * cov @ corner
+    can_fall = corner > 0
+    can_rise = corner < upper if max_weight is not None else corner < 1
+    mean_gap = mean[can_fall][:, None] - mean[can_rise][None, :]
+    curvature_gap = curvature[can_fall][:, None] - curvature[can_rise][None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bounds = np.where(mean_gap > 0, curvature_gap / mean_gap, 0)
+    return max(float(bounds.max(initial=0)), 0.0)
+
+def efficient_frontier(mean_returns, cov_matrix, num_points=50, max_weight=None, risk_free_rate=0.02):
+    """
+    Long-only efficient frontier from annualized mean returns and covariance.
+
+    Every point minimizes w'Cw - t * mu'w for a risk-return tradeoff t, from
+    t = 0 (minimum variance) up to the t where the maximum-return portfolio
+    becomes optimal, geometrically spaced. Points are solved in order by an exact
+    active-set method, each starting from the previous point's weights and
+    active bounds, so most points take only a few small solves. Returns
+    (points, weights): a DataFrame of expected_return, volatility and
+    sharpe_ratio, and a DataFrame of the weights, one row per point.
+    """
+    assets = getattr(cov_matrix, 'columns', None)
+    mean = np.asarray(mean_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    _check_max_weight(len(cov), max_weight)
+    minimum_variance = minimum_variance_weights(cov, max_weight).to_numpy()
+
+    # Geometric spacing, as near-tied means can put the end of the frontier at a very large t.
+    tradeoffs = np.concatenate([[0.0], np.geomspace(1e-4, 1, num_points - 1) * _max_return_tradeoff(mean, cov, max_weight)])
+    weights = np.empty((len(cov), num_points))
+    previous = minimum_variance
+    for point, tradeoff in enumerate(tradeoffs):
+        previous = weights[:, point] = _solve_qp(cov, tradeoff * mean, previous, max_weight)
+
+    expected_return = mean @ weights
+    volatility = np.sqrt(np.maximum(np.einsum('ij,ik,kj->j', weights, cov, weights), 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(volatility > MIN_VOLATILITY, (expected_return - risk_free_rate) / volatility, np.nan)
+    points = pd.DataFrame({
+        'expected_return': expected_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio
+    })
+    return points, pd.DataFrame(weights.T, columns=assets)
+
+def risk_tolerance_to_beta(risk_tolerance):
+    """
+    Inverse of portfolio_analyzer.beta_to_risk_score: the beta a 1-10 score stands for.
+    """
+    breakpoints = [1, 2, 5, 8, 10]
+    betas = [0.0, 0.5, 1.0, 1.5, 2.5]
+    return float(np.interp(risk_tolerance, breakpoints, betas))
+
+def _portfolio_stats(weights, mean, cov, risk_free_rate):
+    expected_return = float(weights @ mean)
+    volatility = float(np.sqrt(max(weights @ cov @ weights, 0)))
+    return {
+        'expected_return': expected_return,
+        'volatility': volatility,
+        'sharpe_ratio': (expected_return - risk_free_rate) / volatility if volatility > MIN_VOLATILITY else float('nan')
+    }
+
+@instrument
+def optimize_portfolio(data, weights, risk_tolerance, benchmark='SPY', context=None, num_points=50, max_weight=None, risk_free_rate=0.02):
+    """
+    Target allocations for the assets in `data` from the context's covariance.
+
+    The risk tolerance caps volatility at the benchmark's volatility times the
+    beta the tolerance corresponds to on the risk score scale; the
+    'Mean-Variance' portfolio is the highest-return frontier point under that
+    cap (the minimum variance portfolio if none is). 'Minimum Variance' and
+    'Risk Parity' portfolios are returned too, all long-only. Returns a dict
+    with the target volatility, the frontier points, the target weights per
+    portfolio and a summary DataFrame comparing them with the current weights.
+    """
+    context = ensure_context(data, context)
+    mean = context.mean_returns * 252
+    cov = context.cov_matrix * 252
+    mean_values, cov_values = mean.to_numpy(), cov.to_numpy()
+
+    points, frontier_weights = efficient_frontier(mean, cov, num_points, max_weight, risk_free_rate)
+    benchmark_volatility = float(context.benchmark_returns(benchmark).iloc[:, 0].std() * np.sqrt(252))
+    target_volatility = risk_tolerance_to_beta(risk_tolerance) * benchmark_volatility
+    eligible = points.index[points['volatility'] <= target_volatility * (1 + 1e-6)]
+    chosen = points.loc[eligible, 'expected_return'].idxmax() if len(eligible) else 0
+
+    portfolios = {
+        'Mean-Variance': frontier_weights.loc[chosen].rename(None),
+        'Minimum Variance': frontier_weights.loc[0].rename(None),
+        'Risk Parity': risk_parity_weights(cov)
+    }
+    summary = pd.DataFrame(
+        {name: _portfolio_stats(target.to_numpy(), mean_values, cov_values, risk_free_rate) for name, target in [('Current', pd.Series(weights, index=mean.index, dtype=float))] + list(portfolios.items())}
+    ).T
+    return {
+        'target_volatility': target_volatility,
+        'frontier': points,
+        'portfolios': portfolios,
+        'summary': summary
+    }
@@ -0,0 +1,84 @@
+import logging
+import numpy as np
+from .data_fetcher import fetch_data
+from .analysis_context import AnalysisContext
+from .price_panel import PricePanel
+from .portfolio_analyzer import calculate_performance, compare_to_benchmark, classify_investment_style, calculate_dynamic_risk_scores, calculate_portfolio_risk_score, analyze_diversification, monte_carlo_simulation
+from .risk_metrics import calculate_risk_metrics
+from .optimizer import optimize_portfolio
+from .recommender import generate_recommendations
+from .report_generator import generate_report
+
+def validate_portfolio(assets, weights, risk_tolerance):
+    """
+    Raise ValueError if a portfolio fails the checks applied to interactive input.
+    """
+    if len(assets) < 1 or '' in assets:
+        raise ValueError("Portfolio must contain at least one valid asset.")
+    duplicates = sorted({asset for asset in assets if assets.count(asset) > 1})
+    if duplicates:
+        raise ValueError(f"Portfolio lists assets more than once: {duplicates}.")
+    if len(weights) != len(assets):
+        raise ValueError(f"Number of weights ({len(weights)}) must match number of assets ({len(assets)}).")
+    if any(w <= 0 for w in weights):
+        raise ValueError("Weights must be positive.")
+    if abs(sum(weights) - 1) > 0.01:
+        raise ValueError("Weights do not sum to 1.")
+    if risk_tolerance < 1 or risk_tolerance > 10:
+        raise ValueError("Risk tolerance must be between 1 and 10.")
+
+def run_analysis(name, assets, weights, risk_tolerance, goals, data=None, chart_format='png', self_contained=False, stream=False, max_weight=0.4, include_charts=True, seed=None):
+    """
+    Run the full analysis, chart and report pipeline for one customer and
+    return the path of the generated report. `max_weight` caps each asset in
+    the optimized allocations (raised to 1 / len(assets) if that is higher).
+    With include_charts=False no charts are drawn and the visualization
+    stack (matplotlib, seaborn) is never imported. `seed` seeds the Monte
+    Carlo simulation; when it is None a fresh one is drawn. Either way the
+    seed used is printed in the report so the run can be reproduced.
+    `data` may be a price DataFrame or a PricePanel.
+    """
+    if data is None:
+        data = fetch_data(assets)
+    panel = None
+    if isinstance(data, PricePanel):
+        panel, data = data, data.to_frame()
+    if data is None or data.empty or data.isna().all().all():
+        raise ValueError(f"No valid data for assets {assets}.")
+    # The price cache leaves out tickers it has no data for; fail here rather than on a shape mismatch later.
+    missing = [asset for asset in assets if asset not in data.columns or data[asset].isna().all()]
+    if missing:
+        raise ValueError(f"No price data for assets {missing}.")
+    context = AnalysisContext(panel if panel is not None else data)
+
+    style_classification = classify_investment_style(assets, context=context)
+    risk_scores = calculate_dynamic_risk_scores(assets, context=context, method='historical')
+    portfolio_risk_score = calculate_portfolio_risk_score(risk_scores, weights)
+    performance = calculate_performance(data, weights, context=context)
+    comparison = compare_to_benchmark(data, weights, context=context)
+    correlation_matrix, high_corr_pairs, style_correlations = analyze_diversification(data, style_classification, context=context)
+    risk_metrics = calculate_risk_metrics(data, weights, context=context)
+    try:
+        optimization = optimize_portfolio(data, weights, risk_tolerance, context=context, max_weight=max(max_weight, 1 / len(assets)))
+    except Exception as e:
+        # The optimized allocations are optional; report without them rather than not at all.
+        logging.error(f"Portfolio optimization failed for {name}, omitting optimized allocations: {e}")
+        optimization = None
+
+    recommendations, style_weights = generate_recommendations(risk_tolerance, performance['volatility'], comparison['benchmark_volatility'], high_corr_pairs, style_correlations, style_classification, weights, goals, assets, portfolio_risk_score, context=context, risk_metrics=risk_metrics, optimization=optimization)
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    final_values = monte_carlo_simulation(data, weights, context=context, seed=seed)
+    charts = {}
+    if include_charts:
+        from .visualizer import create_cumulative_returns_plot, create_correlation_heatmap, create_style_exposure_pie, create_risk_gauge, create_monte_carlo_histogram
+        charts = {
+            'cumulative_returns': create_cumulative_returns_plot(data, weights, context=context, fmt=chart_format),
+            'correlation_heatmap': create_correlation_heatmap(data, context=context, fmt=chart_format),
+            'style_exposure': create_style_exposure_pie(style_weights, fmt=chart_format),
+            'risk_gauge': create_risk_gauge(portfolio_risk_score, risk_tolerance, fmt=chart_format),
+            'monte_carlo': create_monte_carlo_histogram(final_values, fmt=chart_format)
+        }
+
+    return generate_report(name, assets, weights, risk_tolerance, goals, performance, comparison, correlation_matrix, high_corr_pairs, style_correlations, style_weights, risk_scores, portfolio_risk_score, recommendations, final_values, charts=charts, chart_format=chart_format, self_contained=self_contained, stream=stream, risk_metrics=risk_metrics, optimization=optimization, seed=seed, data_coverage=context.coverage)
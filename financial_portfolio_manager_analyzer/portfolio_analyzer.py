@@ -1,11 +1,13 @@
 import pandas as pd
 import numpy as np
-import datetime
-from .data_fetcher import fetch_data, fetch_benchmark_data, get_asset_info
+import logging
+from .data_fetcher import fetch_data, get_asset_infos
+from .analysis_context import AnalysisContext, ensure_context
+from .monte_carlo import DEFAULT_CHUNK_SIZE, run_monte_carlo
+from .instrumentation import instrument
 
-def calculate_performance(data, weights):
+def _performance(daily_returns, weights):
     weights = np.array(weights)
-    daily_returns = data.pct_change().dropna()
     portfolio_daily_returns = daily_returns.dot(weights)
     cumulative_returns = (1 + portfolio_daily_returns).cumprod()
     annualized_return = (cumulative_returns.iloc[-1]) ** (252 / len(cumulative_returns)) - 1
@@ -18,13 +20,19 @@ def calculate_performance(data, weights):
         'sharpe_ratio': sharpe_ratio
     }
 
-def compare_to_benchmark(data, weights, benchmark='SPY'):
-    benchmark_data = fetch_benchmark_data(data.index[0], data.index[-1], benchmark)
-    benchmark_daily_returns = benchmark_data.pct_change().dropna()
+@instrument
+def calculate_performance(data, weights, context=None):
+    context = ensure_context(data, context)
+    return context.memoize(('performance', tuple(weights)), lambda: _performance(context.returns, weights))
+
+@instrument
+def compare_to_benchmark(data, weights, benchmark='SPY', context=None):
+    context = ensure_context(data, context)
+    benchmark_daily_returns = context.benchmark_returns(benchmark)
     benchmark_cumulative_returns = (1 + benchmark_daily_returns).cumprod()
     benchmark_annualized_return = (benchmark_cumulative_returns.iloc[-1]) ** (252 / len(benchmark_cumulative_returns)) - 1
     benchmark_volatility = benchmark_daily_returns.std() * np.sqrt(252)
-    portfolio_performance = calculate_performance(data, weights)
+    portfolio_performance = calculate_performance(data, weights, context=context)
     return {
         'portfolio_cumulative_returns': portfolio_performance['cumulative_returns'],
         'benchmark_cumulative_returns': benchmark_cumulative_returns,
@@ -34,10 +42,12 @@ def compare_to_benchmark(data, weights, benchmark='SPY'):
         'benchmark_volatility': benchmark_volatility
     }
 
-def classify_investment_style(assets):
+@instrument
+def classify_investment_style(assets, context=None):
     style_classification = {}
+    infos = context.asset_infos(assets) if context is not None else get_asset_infos(assets)
     for asset in assets:
-        info = get_asset_info(asset)
+        info = infos[asset]
         pe_ratio = info.get('trailingPE', float('inf'))
         dividend_yield = info.get('dividendYield', 0) * 100
         sector = info.get('sector', '').lower()
@@ -52,78 +62,163 @@ def classify_investment_style(assets):
         style_classification[asset] = style
     return style_classification
 
-def calculate_dynamic_risk_scores(assets, benchmark='SPY'):
-    risk_scores = {}
-    end_date = datetime.date.today()
-    start_date = end_date - datetime.timedelta(days=5*365)
-    
-    benchmark_data = fetch_benchmark_data(start_date, end_date, benchmark)
-    benchmark_returns = benchmark_data.pct_change().dropna()
-    
-    for asset in assets:
-        info = get_asset_info(asset)
-        beta = info.get('beta', 1.0)
-        
-        if beta < 0.5:
-            risk_score = 1 + (beta / 0.5)
-        elif beta < 1.0:
-            risk_score = 2 + (beta - 0.5) * (3 / 0.5)
-        elif beta < 1.5:
-            risk_score = 5 + (beta - 1.0) * (3 / 0.5)
-        else:
-            risk_score = 8 + (beta - 1.5) * (2 / 1.0)
-            if risk_score > 10:
-                risk_score = 10
-        
-        risk_scores[asset] = round(risk_score, 2)
-    return risk_scores
+def beta_to_risk_score(betas):
+    """
+    Map betas to 1-10 risk scores with the piecewise-linear scale
+    (0.5 -> 2, 1.0 -> 5, 1.5 -> 8, capped at 10), for a whole array at once.
+    """
+    betas = np.asarray(betas, dtype=float)
+    scores = np.select(
+        [betas < 0.5, betas < 1.0, betas < 1.5],
+        [1 + betas / 0.5, 2 + (betas - 0.5) * (3 / 0.5), 5 + (betas - 1.0) * (3 / 0.5)],
+        np.minimum(8 + (betas - 1.5) * (2 / 1.0), 10)
+    )
+    return np.round(scores, 2)
+
+@instrument
+def estimate_betas(data, benchmark='SPY', context=None):
+    """
+    Regress every asset's daily returns on the benchmark's in one matrix
+    operation. Returns a DataFrame indexed by asset with beta, annualized
+    alpha, r_squared and annualized idiosyncratic_volatility.
+    """
+    context = ensure_context(data, context)
+    return context.memoize(('betas', benchmark), lambda: _estimate_betas(context.returns, context.benchmark_returns(benchmark).iloc[:, 0]))
 
+def _estimate_betas(returns, benchmark_returns):
+    aligned_benchmark = benchmark_returns.reindex(returns.index)
+    valid = aligned_benchmark.notna().to_numpy()
+    asset_returns = returns.to_numpy()[valid]
+    market = aligned_benchmark.to_numpy()[valid]
+    num_days = len(market)
+
+    asset_centered = asset_returns - asset_returns.mean(axis=0)
+    market_centered = market - market.mean()
+    market_variance = market_centered @ market_centered / (num_days - 1)
+    covariance = market_centered @ asset_centered / (num_days - 1)
+    asset_variance = (asset_centered ** 2).sum(axis=0) / (num_days - 1)
+
+    beta = covariance / market_variance
+    alpha = (asset_returns.mean(axis=0) - beta * market.mean()) * 252
+    r_squared = covariance ** 2 / (market_variance * asset_variance)
+    residual_variance = np.maximum(asset_variance - beta ** 2 * market_variance, 0)
+    return pd.DataFrame({
+        'beta': beta,
+        'alpha': alpha,
+        'r_squared': r_squared,
+        'idiosyncratic_volatility': np.sqrt(residual_variance * 252)
+    }, index=returns.columns)
+
+@instrument
+def calculate_dynamic_risk_scores(assets, benchmark='SPY', context=None, method='metadata'):
+    """
+    Per-asset 1-10 risk scores from beta. method='metadata' uses the beta
+    reported in each asset's info; method='historical' regresses the
+    analyzed price window on the benchmark instead, with no metadata calls.
+    Assets without a beta are scored as beta 1.0.
+    """
+    if method == 'historical':
+        if context is None:
+            context = AnalysisContext(fetch_data(assets))
+        betas = estimate_betas(context.data, benchmark, context=context)['beta'].reindex(assets)
+        betas = betas.fillna(1.0).to_numpy()
+    else:
+        infos = context.asset_infos(assets) if context is not None else get_asset_infos(assets)
+        betas = [infos[asset].get('beta') for asset in assets]
+        betas = [1.0 if beta is None else beta for beta in betas]
+    return dict(zip(assets, beta_to_risk_score(betas).tolist()))
+
+@instrument
 def calculate_portfolio_risk_score(risk_scores, weights):
-    portfolio_risk_score = 0
-    for asset, weight in zip(risk_scores.keys(), weights):
-        portfolio_risk_score += weight * risk_scores[asset]
-    return round(portfolio_risk_score, 2)
+    scores = np.fromiter(risk_scores.values(), dtype=float, count=len(risk_scores))
+    num_assets = min(len(scores), len(weights))
+    portfolio_risk_score = np.dot(scores[:num_assets], np.asarray(weights, dtype=float)[:num_assets])
+    return round(float(portfolio_risk_score), 2)
 
-def get_sector_exposure(assets):
+@instrument
+def get_sector_exposure(assets, context=None):
     sector_exposure = {}
+    infos = context.asset_infos(assets) if context is not None else get_asset_infos(assets)
     for asset in assets:
-        info = get_asset_info(asset)
+        info = infos[asset]
         sector = info.get('sector', 'Unknown')
         sector_exposure[asset] = sector
     return sector_exposure
 
-def analyze_diversification(data, style_classification):
-    daily_returns = data.pct_change().dropna()
-    correlation_matrix = daily_returns.corr()
-    high_corr_pairs = []
-    for i in range(len(correlation_matrix.columns)):
-        for j in range(i+1, len(correlation_matrix.columns)):
-            if abs(correlation_matrix.iloc[i,j]) > 0.8:
-                high_corr_pairs.append((correlation_matrix.columns[i], correlation_matrix.columns[j], correlation_matrix.iloc[i,j]))
-
-    style_correlations = {}
-    styles = set(style_classification.values())
-    for style1 in styles:
-        for style2 in styles:
-            if style1 >= style2:
-                continue
-            assets_style1 = [asset for asset, style in style_classification.items() if style == style1]
-            assets_style2 = [asset for asset, style in style_classification.items() if style == style2]
-            if not assets_style1 or not assets_style2:
-                continue
-            returns_style1 = daily_returns[assets_style1].mean(axis=1)
-            returns_style2 = daily_returns[assets_style2].mean(axis=1)
-            style_corr = returns_style1.corr(returns_style2)
-            style_correlations[f"{style1}-{style2}"] = style_corr
+def high_correlation_pairs(correlation_matrix, threshold=0.8, top_k=None):
+    """
+    Asset pairs whose |correlation| exceeds `threshold`, strongest first,
+    read from the upper triangle of the matrix in one vectorized pass.
+    """
+    values = correlation_matrix.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_corr = values[rows, cols]
+    selected = np.flatnonzero(np.abs(pair_corr) > threshold)
+    selected = selected[np.argsort(-np.abs(pair_corr[selected]), kind='stable')][:top_k]
+    columns = correlation_matrix.columns
+    return [(columns[rows[k]], columns[cols[k]], pair_corr[k]) for k in selected]
+
+def group_correlations(cov_matrix, groups):
+    """
+    Correlations between the equal-weighted mean returns of each pair of groups
+    ({asset: group}), from the covariance matrix in one matrix product.
+    """
+    columns = list(cov_matrix.columns)
+    names = sorted(set(group for asset, group in groups.items() if asset in columns))
+    membership = np.zeros((len(columns), len(names)))
+    for asset, group in groups.items():
+        if asset in columns:
+            membership[columns.index(asset), names.index(group)] = 1
+    membership /= membership.sum(axis=0)
+    group_cov = membership.T @ cov_matrix.to_numpy() @ membership
+    group_std = np.sqrt(np.clip(np.diag(group_cov), 0, None))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_corr = group_cov / np.outer(group_std, group_std)
+    rows, cols = np.triu_indices(len(names), k=1)
+    return {f"{names[i]}-{names[j]}": group_corr[i, j] for i, j in zip(rows, cols)}
+
+@instrument
+def cluster_assets(correlation_matrix, max_clusters=5, method='average'):
+    """
+    Group assets into at most `max_clusters` clusters by hierarchical clustering
+    on the correlation distance sqrt((1 - corr) / 2). Returns {asset: 'Cluster <n>'}.
+    Requires scipy.
+    """
+    try:
+        from scipy.cluster.hierarchy import fcluster, linkage
+        from scipy.spatial.distance import squareform
+    except ImportError as e:
+        raise ImportError("cluster_assets requires scipy (pip install scipy).") from e
+    if len(correlation_matrix) < 2:
+        return {asset: 'Cluster 1' for asset in correlation_matrix.columns}
+    distance = np.sqrt(np.clip((1 - correlation_matrix.to_numpy()) / 2, 0, None))
+    np.fill_diagonal(distance, 0)
+    labels = fcluster(linkage(squareform(distance, checks=False), method=method), max_clusters, criterion='maxclust')
+    return {asset: f"Cluster {label}" for asset, label in zip(correlation_matrix.columns, labels)}
 
+@instrument
+def analyze_diversification(data, style_classification, context=None, threshold=0.8, top_k=None, grouping='style'):
+    """
+    Correlation matrix, highly correlated pairs (sorted by |corr|, optionally
+    only the `top_k`) and correlations between asset groups: investment styles
+    by default, correlation clusters with grouping='cluster', or any
+    {asset: group} mapping passed as `grouping`.
+    """
+    context = ensure_context(data, context)
+    correlation_matrix = context.correlation_matrix
+    high_corr_pairs = high_correlation_pairs(correlation_matrix, threshold, top_k)
+    if isinstance(grouping, dict):
+        groups = grouping
+    elif grouping == 'cluster':
+        groups = cluster_assets(correlation_matrix)
+    else:
+        groups = style_classification
+    style_correlations = group_correlations(context.cov_matrix, groups)
     return correlation_matrix, high_corr_pairs, style_correlations
 
-def monte_carlo_simulation(data, weights, num_simulations=1000, num_days=252):
-    daily_returns = data.pct_change().dropna()
-    mean_returns = daily_returns.mean()
-    cov_matrix = daily_returns.cov()
-    sim_returns = np.random.multivariate_normal(mean_returns, cov_matrix, (num_days, num_simulations))
-    portfolio_sim_returns = np.dot(sim_returns, weights)
-    portfolio_values = np.cumprod(1 + portfolio_sim_returns, axis=0)
-    final_values = portfolio_values[-1, :]
+@instrument
+def monte_carlo_simulation(data, weights, num_simulations=1000, num_days=252, context=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    context = ensure_context(data, context)
+    final_values, seed_entropy = run_monte_carlo(context.mean_returns, context.cov_matrix, weights, num_simulations, num_days, seed=seed, chunk_size=chunk_size, workers=workers)
+    logging.info(f"Monte Carlo simulation of {num_simulations} paths used seed {seed_entropy}")
     return final_values
\ No newline at end of file
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import count
+from .price_panel import PricePanel
+
+PRICE_DTYPE = np.dtype([('date', 'datetime64[D]'), ('price', 'f8')])
+
+DEFAULT_CACHE_DIR = os.path.expanduser(os.environ.get('FPM_CACHE_DIR', '~/financial_portfolio_manager_cache'))
+DEFAULT_TTL = 12 * 60 * 60
+# Relative difference between a stored and a re-fetched price beyond which the history counts as re-adjusted.
+ADJUSTMENT_RTOL = 1e-6
+
+
+def _to_date(value):
+    return pd.Timestamp(value).date()
+
+
+class PriceCache:
+    """
+    On-disk store of daily prices, one memory-mapped NumPy file per ticker.
+
+    `source` is a callable `source(tickers, start_date, end_date)` returning a
+    DataFrame of prices indexed by date with one column per ticker. A ticker
+    already covering the requested window is served from disk; one whose data
+    is older than `ttl` seconds only has the tail from its last stored date
+    fetched. If the price on that date changed (adjusted prices are rescaled
+    after splits and dividends), its full history is fetched again instead.
+    """
+
+    def __init__(self, source, directory=None, ttl=DEFAULT_TTL):
+        self.source = source
+        self.directory = os.path.join(directory or DEFAULT_CACHE_DIR, 'prices')
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, ticker):
+        stem = os.path.join(self.directory, ticker.replace('/', '_'))
+        return stem + '.npy', stem + '.json'
+
+    def _load_meta(self, ticker):
+        meta_path = self._paths(ticker)[1]
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_prices(self, ticker):
+        try:
+            return np.load(self._paths(ticker)[0], mmap_mode='r')
+        except (OSError, ValueError):
+            return np.empty(0, dtype=PRICE_DTYPE)
+
+    def _store(self, ticker, prices, meta):
+        # Write to temporary files and rename so concurrent readers never see a partial file.
+        data_path, meta_path = self._paths(ticker)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(data_path + suffix, 'wb') as f:
+            np.save(f, prices)
+        with open(meta_path + suffix, 'w') as f:
+            json.dump(meta, f)
+        os.replace(data_path + suffix, data_path)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _fetch(self, tickers, start_date, end_date):
+        logging.info(f"Fetching prices for {tickers} from {start_date} to {end_date}")
+        frame = self.source(tickers, start_date, end_date)
+        if frame is None or frame.empty:
+            return {}
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame(tickers[0])
+        count('bytes_fetched', int(frame.memory_usage().sum()), source='prices')
+        fetched = {}
+        for ticker in tickers:
+            if ticker not in frame.columns:
+                continue
+            series = frame[ticker].dropna()
+            if series.empty:
+                continue
+            prices = np.empty(len(series), dtype=PRICE_DTYPE)
+            prices['date'] = pd.DatetimeIndex(series.index).values.astype('datetime64[D]')
+            prices['price'] = series.to_numpy(dtype='f8')
+            fetched[ticker] = prices
+        return fetched
+
+    def _store_full(self, tickers, start_date, end_date, now):
+        for ticker, prices in self._fetch(tickers, start_date, end_date).items():
+            self._store(ticker, prices, {'start': str(start_date), 'end': str(end_date), 'fetched_at': now})
+
+    def _refresh(self, tickers, start_date, end_date):
+        now = time.time()
+        full, tails = [], {}
+        for ticker in tickers:
+            meta = self._load_meta(ticker)
+            stored = self._load_prices(ticker)
+            if meta is None or _to_date(meta['start']) > start_date or not len(stored):
+                full.append(ticker)
+            elif _to_date(meta['end']) < end_date and now - meta['fetched_at'] > self.ttl:
+                # Fetch from the last stored date, so the overlapping day shows whether the history was re-adjusted.
+                tails.setdefault(_to_date(stored['date'][-1]), []).append(ticker)
+        misses = len(full) + sum(len(group) for group in tails.values())
+        count('cache_hits', len(tickers) - misses, cache='prices')
+        count('cache_misses', misses, cache='prices')
+
+        if full:
+            self._store_full(full, start_date, end_date, now)
+
+        readjusted = {}
+        for last_date, group in tails.items():
+            try:
+                fetched = self._fetch(group, last_date, end_date)
+            except Exception as e:
+                # The stored prices are stale but usable; serve them and retry the tail on the next call.
+                logging.error(f"Failed to refresh prices for {group} after {last_date}, serving cached data: {e}")
+                continue
+            for ticker in group:
+                if ticker not in fetched:
+                    # Leave the metadata alone so the same days are requested again on the next call.
+                    logging.warning(f"No prices received for {ticker} after {last_date}, serving cached data")
+                    continue
+                stored = np.array(self._load_prices(ticker))
+                new = fetched[ticker]
+                meta = self._load_meta(ticker)
+                overlap = new['price'][new['date'] == stored['date'][-1]]
+                if len(overlap) and not np.isclose(overlap[0], stored['price'][-1], rtol=ADJUSTMENT_RTOL, atol=0):
+                    # Adjusted prices are rescaled after splits and dividends; never stitch two scales together.
+                    logging.info(f"Adjusted prices of {ticker} changed since {last_date}, fetching its full history again")
+                    readjusted.setdefault(_to_date(meta['start']), []).append(ticker)
+                    continue
+                new = new[new['date'] > stored['date'][-1]]
+                received_end = _to_date(new['date'][-1] + np.timedelta64(1, 'D')) if len(new) else _to_date(meta['end'])
+                meta.update({'end': str(max(received_end, _to_date(meta['end']))), 'fetched_at': now})
+                self._store(ticker, np.concatenate([stored, new]), meta)
+
+        for start, group in readjusted.items():
+            try:
+                self._store_full(group, start, end_date, now)
+            except Exception as e:
+                logging.error(f"Failed to re-fetch prices for {group}, serving cached data: {e}")
+
+    def _windows(self, assets, start_date, end_date):
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        self._refresh(list(dict.fromkeys(assets)), start_date, end_date)
+
+        lo, hi = np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D')
+        windows = {}
+        for ticker in assets:
+            prices = self._load_prices(ticker)
+            window = prices[(prices['date'] >= lo) & (prices['date'] < hi)]
+            if len(window):
+                windows[ticker] = window
+        return windows
+
+    def get_prices(self, assets, start_date, end_date):
+        """
+        Return prices for `assets` in [start_date, end_date) as a DataFrame.
+        """
+        columns = {ticker: pd.Series(window['price'], index=pd.DatetimeIndex(window['date'])) for ticker, window in self._windows(assets, start_date, end_date).items()}
+        if not columns:
+            return pd.DataFrame()
+        frame = pd.DataFrame(columns).sort_index()
+        frame.index.name = 'Date'
+        return frame
+
+    def get_panel(self, assets, start_date, end_date, dtype=np.float64):
+        """
+        Return prices for `assets` in [start_date, end_date) as a PricePanel,
+        filled straight from the stored arrays on the union of their dates.
+        Tickers without data are left out; returns None if none have any.
+        """
+        windows = self._windows(assets, start_date, end_date)
+        if not windows:
+            return None
+        dates = np.unique(np.concatenate([window['date'] for window in windows.values()]))
+        values = np.full((len(dates), len(windows)), np.nan, dtype=dtype)
+        for column, window in enumerate(windows.values()):
+            values[np.searchsorted(dates, window['date']), column] = window['price']
+        return PricePanel(values, pd.DatetimeIndex(dates, name='Date'), list(windows))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+_price_cache = None
+
+
+def get_price_cache():
+    return _price_cache
+
+
+def set_price_cache(cache):
+    """
+    Install the PriceCache used by data_fetcher, e.g. one backed by a local stand-in source.
+    """
+    global _price_cache
+    _price_cache = cache
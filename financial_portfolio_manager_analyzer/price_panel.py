@@ -0,0 +1,160 @@
+import functools
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_ROWS = 1024
+
+def nearest_psd(covariance):
+    """
+    Closest positive semi-definite matrix to the symmetric `covariance` (in
+    the Frobenius norm), by clipping negative eigenvalues to zero. Missing
+    entries of pairs without enough shared dates are taken as zero covariance;
+    rows and columns of assets without a variance stay NaN.
+    """
+    covariance = np.array(covariance, dtype=np.float64)
+    known = ~np.isnan(np.diag(covariance))
+    block = np.nan_to_num(covariance[np.ix_(known, known)])
+    block = (block + block.T) / 2
+    eigenvalues, eigenvectors = np.linalg.eigh(block)
+    if eigenvalues.min(initial=0) < 0:
+        block = (eigenvectors * np.clip(eigenvalues, 0, None)) @ eigenvectors.T
+    covariance[np.ix_(known, known)] = block
+    return covariance
+
+class PricePanel:
+    """
+    Prices (or returns) of many assets on one shared date index, stored as a
+    single C-contiguous (dates x assets) NumPy array with NaN for missing
+    observations, optionally as float32 to halve memory.
+
+    Statistics are pairwise-complete: every asset uses all of its own
+    observations and every pair all of the dates both have, so a late-listing
+    or gappy asset does not truncate the history of the others. They are
+    accumulated in float64 over blocks of `block_rows` dates, which bounds the
+    temporary memory whatever the panel's dtype and length.
+    """
+
+    def __init__(self, values, dates, assets, dtype=None, block_rows=DEFAULT_BLOCK_ROWS):
+        self.values = np.ascontiguousarray(values, dtype=dtype or np.asarray(values).dtype)
+        if self.values.ndim != 2 or self.values.shape != (len(dates), len(assets)):
+            raise ValueError(f"Price array of shape {self.values.shape} does not match {len(dates)} dates and {len(assets)} assets.")
+        self.dates = pd.DatetimeIndex(dates)
+        self.assets = list(assets)
+        self.block_rows = block_rows
+
+    @classmethod
+    def from_frame(cls, frame, dtype=np.float64, block_rows=DEFAULT_BLOCK_ROWS):
+        return cls(frame.to_numpy(dtype=dtype), frame.index, frame.columns, block_rows=block_rows)
+
+    def to_frame(self):
+        """
+        DataFrame over the same array (no copy where pandas allows it).
+        """
+        return pd.DataFrame(self.values, index=self.dates, columns=self.assets, copy=False)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    @functools.cached_property
+    def valid(self):
+        """
+        Boolean (dates x assets) mask of the observations that are present.
+        """
+        return ~np.isnan(self.values)
+
+    @property
+    def first_valid_dates(self):
+        has_data = self.valid.any(axis=0)
+        first = np.where(has_data, self.valid.argmax(axis=0), 0)
+        return pd.Series(np.where(has_data, self.dates[first], pd.NaT), index=self.assets)
+
+    def select(self, assets):
+        columns = [self.assets.index(asset) for asset in assets]
+        return PricePanel(self.values[:, columns], self.dates, assets, block_rows=self.block_rows)
+
+    def returns(self):
+        """
+        Daily simple returns on dates[1:], present only where both the day's
+        and the previous day's price are, asset by asset.
+        """
+        values = self.values[1:] / self.values[:-1] - 1
+        return PricePanel(values, self.dates[1:], self.assets, block_rows=self.block_rows)
+
+    def _blocks(self):
+        for start in range(0, len(self.values), self.block_rows):
+            block = self.values[start:start + self.block_rows].astype(np.float64)
+            yield block, ~np.isnan(block)
+
+    @functools.cached_property
+    def _moments(self):
+        num_assets = self.values.shape[1]
+        total = np.zeros(num_assets)
+        count = np.zeros(num_assets)
+        for block, present in self._blocks():
+            total += np.where(present, block, 0).sum(axis=0)
+            count += present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+        # Co-moments of the mean-centered values over the dates each pair shares, from matrix products.
+        center = np.nan_to_num(mean)
+        pair_count = np.zeros((num_assets, num_assets))
+        pair_sum = np.zeros((num_assets, num_assets))
+        pair_sum_sq = np.zeros((num_assets, num_assets))
+        cross = np.zeros((num_assets, num_assets))
+        for block, present in self._blocks():
+            mask = present.astype(np.float64)
+            centered = np.where(present, block - center, 0)
+            pair_count += mask.T @ mask
+            pair_sum += centered.T @ mask
+            pair_sum_sq += (centered * centered).T @ mask
+            cross += centered.T @ centered
+        return mean, pair_count, pair_sum, pair_sum_sq, cross
+
+    def count(self):
+        return pd.Series(self.valid.sum(axis=0), index=self.assets)
+
+    def mean(self):
+        return pd.Series(self._moments[0], index=self.assets)
+
+    def cov(self, min_periods=2, psd=False):
+        """
+        Pairwise-complete sample covariance matrix, like DataFrame.cov. With
+        missing data the matrix need not be positive semi-definite; psd=True
+        repairs it with nearest_psd, as portfolio variances, simulations and
+        optimizers require.
+        """
+        _, pair_count, pair_sum, _, cross = self._moments
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = (cross - pair_sum * pair_sum.T / pair_count) / (pair_count - 1)
+        covariance[pair_count < max(min_periods, 2)] = np.nan
+        if psd:
+            covariance = nearest_psd(covariance)
+        return pd.DataFrame(covariance, index=self.assets, columns=self.assets)
+
+    def corr(self, min_periods=2, psd=False):
+        """
+        Pairwise-complete correlation matrix, like DataFrame.corr: each pair's
+        variances are taken over the dates the pair shares. With psd=True it
+        is instead derived from cov(psd=True), so it stays consistent with
+        that covariance matrix.
+        """
+        if psd:
+            covariance = self.cov(min_periods, psd=True).to_numpy()
+            std = np.sqrt(np.diag(covariance))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                correlation = np.clip(covariance / np.outer(std, std), -1, 1)
+            np.fill_diagonal(correlation, np.where(std > 0, 1.0, np.nan))
+            return pd.DataFrame(correlation, index=self.assets, columns=self.assets)
+        _, pair_count, pair_sum, pair_sum_sq, cross = self._moments
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = cross - pair_sum * pair_sum.T / pair_count
+            variance = pair_sum_sq - pair_sum ** 2 / pair_count
+            correlation = np.clip(covariance / np.sqrt(variance * variance.T), -1, 1)
+        correlation[pair_count < max(min_periods, 2)] = np.nan
+        np.fill_diagonal(correlation, np.where(np.diag(pair_count) >= max(min_periods, 2), 1.0, np.nan))
+        return pd.DataFrame(correlation, index=self.assets, columns=self.assets)
@@ -1,7 +1,9 @@
 import pandas as pd
 from .portfolio_analyzer import get_sector_exposure
+from .instrumentation import instrument
 
-def generate_recommendations(risk_tolerance, portfolio_volatility, benchmark_volatility, high_corr_pairs, style_correlations, style_classification, weights, goals, assets, portfolio_risk_score):
+@instrument
+def generate_recommendations(risk_tolerance, portfolio_volatility, benchmark_volatility, high_corr_pairs, style_correlations, style_classification, weights, goals, assets, portfolio_risk_score, context=None, risk_metrics=None, optimization=None):
     recommendations = []
 
     risk_mismatch_threshold = 2
@@ -10,9 +12,11 @@ def generate_recommendations(risk_tolerance, portfolio_volatility, benchmark_vol
     elif portfolio_risk_score < risk_tolerance - risk_mismatch_threshold:
         recommendations.append(f"Your portfolio risk score ({portfolio_risk_score}) is significantly lower than your risk tolerance ({risk_tolerance}). You might consider adding higher-risk assets like growth stocks to potentially increase returns.")
 
-    if risk_tolerance < 4 and portfolio_volatility > benchmark_volatility.iloc[0]:
+    if hasattr(benchmark_volatility, 'iloc'):
+        benchmark_volatility = benchmark_volatility.iloc[0]
+    if risk_tolerance < 4 and portfolio_volatility > benchmark_volatility:
         recommendations.append("Your portfolio is more volatile than the benchmark (S&P 500). Consider shifting to more conservative investments, such as bonds or dividend-paying stocks.")
-    elif risk_tolerance > 7 and portfolio_volatility < benchmark_volatility.iloc[0]:
+    elif risk_tolerance > 7 and portfolio_volatility < benchmark_volatility:
         recommendations.append("Your portfolio is less volatile than the benchmark (S&P 500). If seeking higher returns, you might consider adding growth stocks or ETFs in emerging markets.")
 
     if high_corr_pairs:
@@ -37,13 +41,31 @@ def generate_recommendations(risk_tolerance, portfolio_volatility, benchmark_vol
         elif abs(corr) < 0.3:
             recommendations.append(f"Your {style_pair} assets have low correlation (correlation: {corr:.2f}), which is good for diversification.")
 
-    sector_exposure = get_sector_exposure(assets)
+    sector_exposure = get_sector_exposure(assets, context=context)
     sector_counts = pd.Series(sector_exposure.values()).value_counts()
     dominant_sector = sector_counts.idxmax()
     dominant_sector_weight = sector_counts[dominant_sector] / len(assets)
     if dominant_sector_weight > 0.5:
         recommendations.append(f"Your portfolio is heavily concentrated in the {dominant_sector} sector ({dominant_sector_weight:.0%} of assets). To reduce sector-specific risk, consider diversifying into other sectors like healthcare or consumer staples.")
 
+    if risk_metrics is not None:
+        tolerable_drawdown = 0.05 + 0.05 * risk_tolerance
+        if risk_metrics['max_drawdown'] < -tolerable_drawdown:
+            recommendations.append(f"Your portfolio's maximum drawdown over the analysis period was {-risk_metrics['max_drawdown']:.0%}, which is large for your risk tolerance ({risk_tolerance}). Consider adding assets that held up better in downturns, such as bonds, to limit losses.")
+        window_volatilities = sorted((window, metrics['volatility'].iloc[-1]) for window, metrics in risk_metrics['windows'].items())
+        if len(window_volatilities) > 1:
+            (short_window, short_volatility), (long_window, long_volatility) = window_volatilities[0], window_volatilities[-1]
+            if short_volatility > 1.5 * long_volatility:
+                recommendations.append(f"Recent volatility ({short_volatility:.0%} annualized over {short_window} days) is well above its {long_window}-day level ({long_volatility:.0%}). Review position sizes in the most volatile holdings.")
+
+    if optimization is not None:
+        target = optimization['portfolios']['Mean-Variance']
+        current_stats, target_stats = optimization['summary'].loc['Current'], optimization['summary'].loc['Mean-Variance']
+        changes = [(asset, weight, target[asset]) for asset, weight in zip(assets, weights) if abs(target[asset] - weight) >= 0.05]
+        if changes and target_stats['sharpe_ratio'] > current_stats['sharpe_ratio']:
+            changes_text = ", ".join([f"{'increase' if new_weight > weight else 'reduce'} {asset} to {new_weight:.0%}" for asset, weight, new_weight in changes])
+            recommendations.append(f"A mean-variance allocation within your risk tolerance (volatility up to {optimization['target_volatility']:.0%}) targets an expected return of {target_stats['expected_return']:.1%} at {target_stats['volatility']:.1%} volatility, versus {current_stats['expected_return']:.1%} at {current_stats['volatility']:.1%} now: {changes_text}. These targets come from historical returns and should be reviewed before rebalancing.")
+
     if 'retirement' in goals.lower():
         recommendations.append("For retirement planning, ensure your portfolio includes stable, income-generating assets like bonds or dividend stocks, and aligns with your time horizon and risk tolerance.")
     elif 'wealth accumulation' in goals.lower():
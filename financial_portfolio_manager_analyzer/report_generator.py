@@ -1,12 +1,57 @@
 import numpy as np
-from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup
+import base64
 import datetime
+import functools
 import os
-import shutil
+from .risk_metrics import summarize_risk_metrics
+from .instrumentation import instrument
 
-def generate_report(name, assets, weights, risk_tolerance, goals, performance, comparison, correlation_matrix, high_corr_pairs, style_correlations, style_weights, risk_scores, portfolio_risk_score, recommendations, final_values):
-    env = Environment(loader=FileSystemLoader('templates'))
-    template = env.get_template('report_template.html')
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+REPORTS_DIR = os.path.expanduser(os.environ.get('FPM_REPORTS_DIR', '~/financial_portfolio_manager_reports'))
+
+CHART_MIME_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# The correlation table is N x N cells of HTML; above this many assets only the heatmap and the
+# highly correlated pairs are shown.
+CORRELATION_TABLE_MAX_ASSETS = 25
+
+@functools.lru_cache(maxsize=None)
+def _environment():
+    # Templates are compiled once per process; auto_reload is off so renders do not stat the template file.
+    # jinja2 is imported with the first report rather than with the package.
+    from jinja2 import Environment, FileSystemLoader
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False, trim_blocks=True, lstrip_blocks=True)
+
+@functools.lru_cache(maxsize=None)
+def get_template(template_name='report_template.html'):
+    return _environment().get_template(template_name)
+
+def _scalar(value):
+    # Benchmark statistics come back as one-element Series (one column per benchmark symbol).
+    return float(value.iloc[0]) if hasattr(value, 'iloc') else float(value)
+
+def _chart_source(chart_name, charts, chart_format, self_contained):
+    if self_contained:
+        encoded = base64.b64encode(charts[chart_name]).decode('ascii')
+        return f"data:{CHART_MIME_TYPES[chart_format]};base64,{encoded}"
+    return f'{chart_name}.{chart_format}'
+
+@instrument
+def generate_report(name, assets, weights, risk_tolerance, goals, performance, comparison, correlation_matrix, high_corr_pairs, style_correlations, style_weights, risk_scores, portfolio_risk_score, recommendations, final_values, charts=None, chart_format='png', self_contained=False, stream=False, reports_dir=None, risk_metrics=None, optimization=None, seed=None, data_coverage=None):
+    """
+    Render the HTML report and write it, together with the rendered `charts`
+    ({chart name: image bytes} from the visualizer), to the customer's directory.
+
+    With `self_contained` the charts are embedded in the HTML as base64 data
+    URIs and no image files are written. With `stream` the template is
+    rendered chunk by chunk straight into the report file. `data_coverage`
+    (AnalysisContext.coverage) notes which sections use which history when
+    they differ.
+    """
+    charts = charts or {}
+    template = get_template()
     report_data = {
         'name': name,
         'date': datetime.date.today().strftime("%B %d, %Y"),
@@ -20,24 +65,44 @@ def generate_report(name, assets, weights, risk_tolerance, goals, performance, c
         'annualized_return': round(performance['annualized_return'] * 100, 2),
         'volatility': round(performance['volatility'] * 100, 2),
         'sharpe_ratio': round(performance['sharpe_ratio'], 2),
-        'benchmark_annualized_return': round(comparison['benchmark_annualized_return'] * 100, 2),
-        'benchmark_volatility': round(comparison['benchmark_volatility'] * 100, 2),
-        'correlation_matrix': correlation_matrix.to_html(),
+        'benchmark_annualized_return': round(_scalar(comparison['benchmark_annualized_return']) * 100, 2),
+        'benchmark_volatility': round(_scalar(comparison['benchmark_volatility']) * 100, 2),
+        'correlation_matrix': Markup(correlation_matrix.round(2).to_html()) if len(correlation_matrix) <= CORRELATION_TABLE_MAX_ASSETS else None,
+        'num_assets': len(correlation_matrix),
         'high_corr_pairs': high_corr_pairs,
         'style_correlations': style_correlations,
         'style_weights': {style: round(weight * 100, 2) for style, weight in style_weights.items()},
         'recommendations': recommendations,
         'monte_carlo_mean': round(np.mean(final_values), 2),
         'monte_carlo_std': round(np.std(final_values), 2),
-        'cumulative_returns_plot': 'cumulative_returns.png',
-        'correlation_heatmap': 'correlation_heatmap.png',
-        'style_exposure_plot': 'style_exposure.png',
-        'risk_gauge_plot': 'risk_gauge.png',
-        'monte_carlo_plot': 'monte_carlo.png'
+        'monte_carlo_seed': seed,
+        'data_coverage': data_coverage
     }
-    html_content = template.render(report_data)
+    if risk_metrics is not None:
+        report_data['max_drawdown'] = round(risk_metrics['max_drawdown'] * 100, 2)
+        report_data['value_at_risk'] = round(risk_metrics['var'] * 100, 2)
+        report_data['conditional_value_at_risk'] = round(risk_metrics['cvar'] * 100, 2)
+        report_data['risk_confidence'] = f"{risk_metrics['confidence']:.0%}"
+        report_data['risk_windows'] = summarize_risk_metrics(risk_metrics)
+    if optimization is not None:
+        report_data['optimized_portfolios'] = [
+            {
+                'name': portfolio_name,
+                'expected_return': round(row['expected_return'] * 100, 2),
+                'volatility': round(row['volatility'] * 100, 2),
+                'sharpe_ratio': round(row['sharpe_ratio'], 2),
+                'weights': [round(weight * 100, 2) for weight in (weights if portfolio_name == 'Current' else optimization['portfolios'][portfolio_name].reindex(assets).fillna(0))]
+            }
+            for portfolio_name, row in optimization['summary'].iterrows()
+        ]
+        report_data['optimization_target_volatility'] = round(optimization['target_volatility'] * 100, 2)
+        report_data['optimized_assets'] = assets
+    for key, chart_name in [('cumulative_returns_plot', 'cumulative_returns'), ('correlation_heatmap', 'correlation_heatmap'), ('style_exposure_plot', 'style_exposure'), ('risk_gauge_plot', 'risk_gauge'), ('monte_carlo_plot', 'monte_carlo')]:
+        if chart_name not in charts:
+            continue
+        report_data[key] = _chart_source(chart_name, charts, chart_format, self_contained)
     
-    reports_dir = os.path.expanduser("~/financial_portfolio_manager_reports")
+    reports_dir = reports_dir or REPORTS_DIR
     os.makedirs(reports_dir, exist_ok=True)
     customer_dir = os.path.join(reports_dir, name.replace(" ", "_"))
     os.makedirs(customer_dir, exist_ok=True)
@@ -45,9 +110,15 @@ def generate_report(name, assets, weights, risk_tolerance, goals, performance, c
     report_filename = f"report_{name.replace(' ', '_')}_{datetime.date.today().strftime('%Y%m%d')}.html"
     report_path = os.path.join(customer_dir, report_filename)
     with open(report_path, 'w') as f:
-        f.write(html_content)
+        if stream:
+            f.writelines(template.generate(report_data))
+        else:
+            f.write(template.render(report_data))
     
-    for img in ['cumulative_returns.png', 'correlation_heatmap.png', 'style_exposure.png', 'risk_gauge.png', 'monte_carlo.png']:
-        shutil.copy(img, customer_dir)
+    if not self_contained:
+        for chart_name, image in charts.items():
+            with open(os.path.join(customer_dir, f"{chart_name}.{chart_format}"), 'wb') as f:
+                f.write(image)
     
-    print(f"Report saved to {report_path}")
\ No newline at end of file
+    print(f"Report saved to {report_path}")
+    return report_path
\ No newline at end of file
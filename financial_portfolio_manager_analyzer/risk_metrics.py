@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from .analysis_context import ensure_context
+from .instrumentation import instrument
+
+DEFAULT_WINDOWS = (21, 63, 252)
+
+def _window_sums(cumulative, window):
+    # cumulative has a leading zero row, so row t of the result sums observations t .. t + window - 1.
+    return cumulative[window:] - cumulative[:-window]
+
+def _cumulative(*columns):
+    stacked = np.column_stack(columns)
+    return np.vstack([np.zeros(stacked.shape[1]), np.cumsum(stacked, axis=0)])
+
+def max_drawdown(returns):
+    """
+    Largest peak-to-trough fall of the cumulative growth of `returns`, as a negative fraction.
+    """
+    growth = np.cumprod(1 + np.asarray(returns))
+    if not len(growth):
+        return np.nan
+    peaks = np.maximum.accumulate(np.concatenate([[1.0], growth]))[1:]
+    return float((growth / peaks - 1).min())
+
+def historical_var(returns, confidence=0.95):
+    """
+    Historical one-day VaR and CVaR (expected shortfall) as positive loss fractions.
+    """
+    returns = np.asarray(returns)
+    if not len(returns):
+        return np.nan, np.nan
+    cutoff = np.quantile(returns, 1 - confidence)
+    return float(-cutoff), float(-returns[returns <= cutoff].mean())
+
+@instrument
+def calculate_risk_metrics(data, weights, windows=DEFAULT_WINDOWS, confidence=0.95, benchmark='SPY', risk_free_rate=0.02, context=None):
+    """
+    Rolling and multi-horizon risk metrics of the portfolio.
+
+    Rolling volatility, Sharpe (annualized arithmetic mean excess return over
+    volatility) and beta to the benchmark come from differences of cumulative
+    sums, so every window length is an O(T) pass over the same arrays. For
+    each window the trailing max drawdown and historical VaR/CVaR over the
+    last `window` days are reported too, next to whole-period figures.
+    """
+    context = ensure_context(data, context)
+    returns = context.returns
+    portfolio = pd.Series(returns.to_numpy() @ np.asarray(weights, dtype=float), index=returns.index)
+    bench = context.benchmark_returns(benchmark).iloc[:, 0].reindex(returns.index) if benchmark is not None else None
+
+    # Variances are shift-invariant, so center on the full-period mean to limit cancellation in the sums.
+    centered = portfolio.to_numpy() - portfolio.mean()
+    sums = _cumulative(centered, centered ** 2)
+    if bench is not None:
+        joint = bench.notna().to_numpy()
+        joint_index = returns.index[joint]
+        p = portfolio.to_numpy()[joint] - portfolio.to_numpy()[joint].mean()
+        b = bench.to_numpy()[joint] - bench.to_numpy()[joint].mean()
+        joint_sums = _cumulative(p, b, p * b, b ** 2)
+
+    var, cvar = historical_var(portfolio, confidence)
+    metrics = {
+        'max_drawdown': max_drawdown(portfolio),
+        'var': var,
+        'cvar': cvar,
+        'confidence': confidence,
+        'windows': {}
+    }
+    for window in windows:
+        if window < 2 or window > len(portfolio):
+            continue
+        total, total_sq = _window_sums(sums, window).T
+        variance = np.maximum((total_sq - total ** 2 / window) / (window - 1), 0)
+        mean = total / window + portfolio.mean()
+        volatility = np.sqrt(variance * 252)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = (mean * 252 - risk_free_rate) / volatility
+        index = returns.index[window - 1:]
+        window_var, window_cvar = historical_var(portfolio.iloc[-window:], confidence)
+        window_metrics = {
+            'volatility': pd.Series(volatility, index=index),
+            'sharpe': pd.Series(sharpe, index=index),
+            'max_drawdown': max_drawdown(portfolio.iloc[-window:]),
+            'var': window_var,
+            'cvar': window_cvar
+        }
+        if bench is not None and window <= len(joint_index):
+            p_sum, b_sum, pb_sum, b_sq = _window_sums(joint_sums, window).T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                beta = (pb_sum - p_sum * b_sum / window) / (b_sq - b_sum ** 2 / window)
+            window_metrics['beta'] = pd.Series(beta, index=joint_index[window - 1:])
+        metrics['windows'][window] = window_metrics
+    return metrics
+
+def summarize_risk_metrics(metrics):
+    """
+    One row per window with the latest rolling values, for reports.
+    """
+    rows = []
+    for window, window_metrics in metrics['windows'].items():
+        rows.append({
+            'window': window,
+            'volatility': float(window_metrics['volatility'].iloc[-1]),
+            'sharpe': float(window_metrics['sharpe'].iloc[-1]),
+            'beta': float(window_metrics['beta'].iloc[-1]) if 'beta' in window_metrics else np.nan,
+            'max_drawdown': window_metrics['max_drawdown'],
+            'var': window_metrics['var'],
+            'cvar': window_metrics['cvar']
+        })
+    return rows
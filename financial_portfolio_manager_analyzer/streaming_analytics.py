@@ -0,0 +1,168 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+from .portfolio_analyzer import high_correlation_pairs, group_correlations
+
+class StreamingAnalytics:
+    """
+    Incrementally updated portfolio analytics for live price bars.
+
+    Keeps Welford running means and co-moments of the constituent (and
+    benchmark) daily returns, cumulative growth factors and a rolling window
+    of portfolio returns, so each update() costs O(N^2) and the outputs of
+    calculate_performance, compare_to_benchmark and analyze_diversification
+    are available at any time without re-reading history. Bars with missing
+    asset prices are skipped, as pct_change().dropna() would drop them.
+    """
+
+    def __init__(self, assets, weights, benchmark='SPY', window=63):
+        self.assets = list(assets)
+        self.weights = np.asarray(weights, dtype=float)
+        self.benchmark = benchmark
+        self.window = window
+        size = len(self.assets) + (benchmark is not None)
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))
+        self.portfolio_growth = 1.0
+        self.benchmark_growth = 1.0
+        self.last_prices = None
+        self.recent_returns = deque(maxlen=window)
+        self._recent_sum = 0.0
+        self._recent_sumsq = 0.0
+
+    @classmethod
+    def from_history(cls, data, weights, benchmark_data=None, benchmark='SPY', window=63):
+        """
+        Initialize from a price history in one vectorized pass; `benchmark_data`
+        is a price Series (or one-column DataFrame) aligned on the same dates.
+        """
+        analytics = cls(data.columns, weights, benchmark if benchmark_data is not None else None, window)
+        prices = data
+        if benchmark_data is not None:
+            if isinstance(benchmark_data, pd.DataFrame):
+                benchmark_data = benchmark_data.iloc[:, 0]
+            prices = data.join(benchmark_data.rename('__benchmark__'), how='inner')
+        returns = prices.pct_change().dropna().to_numpy()
+        analytics.count = len(returns)
+        if len(returns):
+            analytics.mean = returns.mean(axis=0)
+            centered = returns - analytics.mean
+            analytics.comoment = centered.T @ centered
+            portfolio_returns = returns[:, :len(analytics.assets)] @ analytics.weights
+            analytics.portfolio_growth = float(np.prod(1 + portfolio_returns))
+            if benchmark_data is not None:
+                analytics.benchmark_growth = float(np.prod(1 + returns[:, -1]))
+            for value in portfolio_returns[-window:]:
+                analytics._push_recent(value)
+        analytics.last_prices = prices.iloc[-1].to_numpy(dtype=float)
+        return analytics
+
+    def _push_recent(self, value):
+        if len(self.recent_returns) == self.window:
+            dropped = self.recent_returns[0]
+            self._recent_sum -= dropped
+            self._recent_sumsq -= dropped * dropped
+        self.recent_returns.append(value)
+        self._recent_sum += value
+        self._recent_sumsq += value * value
+
+    def update(self, prices, benchmark_price=None):
+        """
+        Add one price bar: `prices` for the assets (in order, or a Series keyed
+        by asset) and the benchmark price if a benchmark is tracked.
+        """
+        if isinstance(prices, pd.Series):
+            prices = prices.reindex(self.assets)
+        bar = np.asarray(prices, dtype=float)
+        if np.isnan(bar).any():
+            return
+        if self.benchmark is not None:
+            if benchmark_price is None:
+                raise ValueError(f"A {self.benchmark} price is required with every bar.")
+            bar = np.append(bar, float(benchmark_price))
+            if np.isnan(bar[-1]):
+                return
+        if self.last_prices is None:
+            self.last_prices = bar
+            return
+        returns = bar / self.last_prices - 1
+        self.last_prices = bar
+
+        self.count += 1
+        delta = returns - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, returns - self.mean)
+
+        portfolio_return = float(returns[:len(self.assets)] @ self.weights)
+        self.portfolio_growth *= 1 + portfolio_return
+        if self.benchmark is not None:
+            self.benchmark_growth *= 1 + returns[-1]
+        self._push_recent(portfolio_return)
+
+    @property
+    def cov_matrix(self):
+        covariance = self.comoment[:len(self.assets), :len(self.assets)] / (self.count - 1)
+        return pd.DataFrame(covariance, index=self.assets, columns=self.assets)
+
+    @property
+    def correlation_matrix(self):
+        covariance = self.cov_matrix
+        std = np.sqrt(np.diag(covariance))
+        return covariance / np.outer(std, std)
+
+    def _annualized(self, growth):
+        return growth ** (252 / self.count) - 1
+
+    def performance(self):
+        """
+        Same figures as calculate_performance, with the latest cumulative
+        growth factor in place of the full cumulative return series.
+        """
+        num_assets = len(self.assets)
+        variance = self.weights @ self.comoment[:num_assets, :num_assets] @ self.weights / (self.count - 1)
+        annualized_return = self._annualized(self.portfolio_growth)
+        volatility = np.sqrt(variance * 252)
+        return {
+            'cumulative_return': self.portfolio_growth,
+            'annualized_return': annualized_return,
+            'volatility': float(volatility),
+            'sharpe_ratio': float((annualized_return - 0.02) / volatility)
+        }
+
+    def rolling_volatility(self):
+        """
+        Annualized volatility of the portfolio over the last `window` returns.
+        """
+        size = len(self.recent_returns)
+        if size < 2:
+            return np.nan
+        variance = (self._recent_sumsq - self._recent_sum ** 2 / size) / (size - 1)
+        return float(np.sqrt(max(variance, 0.0) * 252))
+
+    def benchmark_comparison(self):
+        """
+        Same figures as compare_to_benchmark (scalars), plus the portfolio's beta.
+        """
+        if self.benchmark is None:
+            raise ValueError("No benchmark is being tracked.")
+        performance = self.performance()
+        num_assets = len(self.assets)
+        benchmark_variance = self.comoment[-1, -1] / (self.count - 1)
+        covariance = self.weights @ self.comoment[:num_assets, -1] / (self.count - 1)
+        return {
+            'portfolio_cumulative_return': self.portfolio_growth,
+            'benchmark_cumulative_return': float(self.benchmark_growth),
+            'portfolio_annualized_return': performance['annualized_return'],
+            'benchmark_annualized_return': float(self._annualized(self.benchmark_growth)),
+            'portfolio_volatility': performance['volatility'],
+            'benchmark_volatility': float(np.sqrt(benchmark_variance * 252)),
+            'beta': float(covariance / benchmark_variance)
+        }
+
+    def diversification(self, style_classification, threshold=0.8, top_k=None):
+        """
+        Same outputs as analyze_diversification from the running covariance.
+        """
+        correlation_matrix = self.correlation_matrix
+        return correlation_matrix, high_correlation_pairs(correlation_matrix, threshold, top_k), group_correlations(self.cov_matrix, style_classification)
@@ -1,46 +1,64 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import io
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
-from .data_fetcher import fetch_benchmark_data
+from .analysis_context import ensure_context
+from .portfolio_analyzer import calculate_performance
+from .instrumentation import instrument
 
-def create_cumulative_returns_plot(data, weights, benchmark='SPY'):
-    weights = np.array(weights)
-    daily_returns = data.pct_change().dropna()
-    portfolio_daily_returns = daily_returns.dot(weights)
-    portfolio_cumulative = (1 + portfolio_daily_returns).cumprod()
+def _new_figure(figsize):
+    # Figures are built without pyplot so charts can be rendered from several threads at once.
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _render(fig, fmt, **savefig_kwargs):
+    """
+    Render a figure into an in-memory buffer and return its bytes (PNG or SVG).
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, **savefig_kwargs)
+    return buffer.getvalue()
+
+@instrument
+def create_cumulative_returns_plot(data, weights, benchmark='SPY', context=None, fmt='png'):
+    context = ensure_context(data, context)
+    portfolio_cumulative = calculate_performance(data, weights, context=context)['cumulative_returns']
     
-    benchmark_data = fetch_benchmark_data(data.index[0], data.index[-1], benchmark)
-    benchmark_cumulative = (1 + benchmark_data.pct_change()).cumprod()
+    benchmark_cumulative = (1 + context.benchmark_returns(benchmark)).cumprod()
     
-    plt.figure(figsize=(10,6))
-    plt.plot(portfolio_cumulative, label='Portfolio')
-    plt.plot(benchmark_cumulative, label=benchmark)
-    plt.title('Cumulative Returns')
-    plt.legend()
-    plt.savefig('cumulative_returns.png')
-    plt.close()
+    fig = _new_figure((10,6))
+    ax = fig.add_subplot()
+    ax.plot(portfolio_cumulative, label='Portfolio')
+    ax.plot(benchmark_cumulative, label=benchmark)
+    ax.set_title('Cumulative Returns')
+    ax.legend()
+    return _render(fig, fmt)
 
-def create_correlation_heatmap(data):
-    daily_returns = data.pct_change().dropna()
-    correlation_matrix = daily_returns.corr()
-    plt.figure(figsize=(8,6))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm')
-    plt.title('Asset Correlation Matrix')
-    plt.savefig('correlation_heatmap.png')
-    plt.close()
-    return correlation_matrix
+@instrument
+def create_correlation_heatmap(data, context=None, fmt='png'):
+    import seaborn as sns
+    correlation_matrix = ensure_context(data, context).correlation_matrix
+    fig = _new_figure((8,6))
+    ax = fig.add_subplot()
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', ax=ax)
+    ax.set_title('Asset Correlation Matrix')
+    return _render(fig, fmt)
 
-def create_style_exposure_pie(style_weights):
-    plt.figure(figsize=(8,6))
+@instrument
+def create_style_exposure_pie(style_weights, fmt='png'):
+    fig = _new_figure((8,6))
+    ax = fig.add_subplot()
     labels = [f"{style} ({weight:.0%})" for style, weight in style_weights.items() if weight > 0]
     sizes = [weight for weight in style_weights.values() if weight > 0]
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
-    plt.title('Portfolio Allocation by Investment Style')
-    plt.savefig('style_exposure.png')
-    plt.close()
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
+    ax.set_title('Portfolio Allocation by Investment Style')
+    return _render(fig, fmt)
 
-def create_risk_gauge(portfolio_risk_score, risk_tolerance):
-    fig, ax = plt.subplots(figsize=(8, 4), subplot_kw={'aspect': 'equal'})
+@instrument
+def create_risk_gauge(portfolio_risk_score, risk_tolerance, fmt='png'):
+    fig = _new_figure((8, 4))
+    ax = fig.add_subplot(aspect='equal')
     
     angles = np.linspace(np.pi, 0, 181)
     radius = 1
@@ -73,14 +91,14 @@ def create_risk_gauge(portfolio_risk_score, risk_tolerance):
     ax.text(0, 0, 'Moderate', color='black', fontsize=10)
     ax.text(1.2, 0, 'High', color='red', fontsize=10)
     
-    plt.savefig('risk_gauge.png', bbox_inches='tight')
-    plt.close()
+    return _render(fig, fmt, bbox_inches='tight')
 
-def create_monte_carlo_histogram(final_values):
-    plt.figure(figsize=(10,6))
-    plt.hist(final_values, bins=50)
-    plt.title('Distribution of Portfolio Values after 1 Year')
-    plt.xlabel('Portfolio Value')
-    plt.ylabel('Frequency')
-    plt.savefig('monte_carlo.png')
-    plt.close()
\ No newline at end of file
+@instrument
+def create_monte_carlo_histogram(final_values, fmt='png'):
+    fig = _new_figure((10,6))
+    ax = fig.add_subplot()
+    ax.hist(final_values, bins=50)
+    ax.set_title('Distribution of Portfolio Values after 1 Year')
+    ax.set_xlabel('Portfolio Value')
+    ax.set_ylabel('Frequency')
+    return _render(fig, fmt)
\ No newline at end of file
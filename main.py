@@ -1,8 +1,10 @@
-from financial_portfolio_manager_analyzer.data_fetcher import fetch_data
-from financial_portfolio_manager_analyzer.portfolio_analyzer import calculate_performance, compare_to_benchmark, classify_investment_style, calculate_dynamic_risk_scores, calculate_portfolio_risk_score, analyze_diversification, monte_carlo_simulation
-from financial_portfolio_manager_analyzer.recommender import generate_recommendations
-from financial_portfolio_manager_analyzer.visualizer import create_cumulative_returns_plot, create_correlation_heatmap, create_style_exposure_pie, create_risk_gauge, create_monte_carlo_histogram
-from financial_portfolio_manager_analyzer.report_generator import generate_report
+import argparse
+import json
+import logging
+
+# The analysis package (pandas, yfinance, jinja2, and matplotlib/seaborn when charts
+# are drawn) is imported inside the functions below, so the CLI starts and prompts
+# before any of it is loaded.
 
 def get_user_input():
     print("Welcome to Financial Portfolio Manager Portfolio Analyzer")
@@ -17,10 +19,17 @@ def get_user_input():
         if len(assets) < 1 or '' in assets:
             print("Please enter at least one valid asset.")
             continue
+        if len(set(assets)) != len(assets):
+            print("Please enter each asset only once.")
+            continue
         try:
+            from financial_portfolio_manager_analyzer.data_fetcher import fetch_data
             test_data = fetch_data(assets)
             if test_data.empty or test_data.isna().all().all():
                 raise ValueError("No valid data for these assets.")
+            missing = [asset for asset in assets if asset not in test_data.columns or test_data[asset].isna().all()]
+            if missing:
+                raise ValueError(f"No data for {', '.join(missing)}.")
             break
         except Exception as e:
             print(f"Error with assets: {e}. Please enter valid stock symbols.")
@@ -58,28 +67,32 @@ def get_user_input():
 
     return name, assets, weights, risk_tolerance, goals
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Financial Portfolio Manager Portfolio Analyzer")
+    parser.add_argument('--batch', metavar='FILE', help="CSV or JSON file of clients to analyze non-interactively")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes for --batch (default: CPU count)")
+    parser.add_argument('--summary', metavar='FILE', help="Write the --batch per-client summary to this JSON file")
+    parser.add_argument('--self-contained', action='store_true', help="Embed charts in the HTML report instead of writing image files")
+    parser.add_argument('--seed', type=int, default=None, help="Monte Carlo seed (default: a fresh one, printed in each report and the --batch summary)")
+    parser.add_argument('--no-charts', action='store_true', help="Skip the charts (and loading matplotlib/seaborn) for faster text-only reports")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.batch:
+        from financial_portfolio_manager_analyzer.batch_runner import load_clients, run_batch, format_summary
+        results = run_batch(load_clients(args.batch), workers=args.workers, self_contained=args.self_contained, include_charts=not args.no_charts, seed=args.seed)
+        print(format_summary(results))
+        if args.summary:
+            with open(args.summary, 'w') as f:
+                json.dump(results, f, indent=2)
+        return
+
     name, assets, weights, risk_tolerance, goals = get_user_input()
     
-    data = fetch_data(assets)
-    
-    style_classification = classify_investment_style(assets)
-    risk_scores = calculate_dynamic_risk_scores(assets)
-    portfolio_risk_score = calculate_portfolio_risk_score(risk_scores, weights)
-    performance = calculate_performance(data, weights)
-    comparison = compare_to_benchmark(data, weights)
-    correlation_matrix, high_corr_pairs, style_correlations = analyze_diversification(data, style_classification)
-    
-    recommendations, style_weights = generate_recommendations(risk_tolerance, performance['volatility'], comparison['benchmark_volatility'], high_corr_pairs, style_correlations, style_classification, weights, goals, assets, portfolio_risk_score)
-    
-    create_cumulative_returns_plot(data, weights)
-    create_correlation_heatmap(data)
-    create_style_exposure_pie(style_weights)
-    create_risk_gauge(portfolio_risk_score, risk_tolerance)
-    final_values = monte_carlo_simulation(data, weights)
-    create_monte_carlo_histogram(final_values)
-    
-    generate_report(name, assets, weights, risk_tolerance, goals, performance, comparison, correlation_matrix, high_corr_pairs, style_correlations, style_weights, risk_scores, portfolio_risk_score, recommendations, final_values)
+    from financial_portfolio_manager_analyzer.pipeline import run_analysis
+    run_analysis(name, assets, weights, risk_tolerance, goals, self_contained=args.self_contained, include_charts=not args.no_charts, seed=args.seed)
     print("Report generated successfully.")
 
 if __name__ == '__main__':
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_portfolio_manager_analyzer import async_fetcher, metadata_cache, price_cache, report_generator
+from financial_portfolio_manager_analyzer.async_fetcher import LocalProvider, as_price_source
+
+TICKERS = ['AAA', 'BBB', 'CCC', 'SPY']
+
+
+@pytest.fixture
+def local_source(tmp_path, monkeypatch):
+    """
+    Serve synthetic prices and asset info for TICKERS through scratch caches in
+    `tmp_path`, and write reports there. Returns the price DataFrame.
+    """
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=600)
+    market = rng.normal(0.0004, 0.01, (len(dates), 1))
+    prices = pd.DataFrame(100 * np.cumprod(1 + market * [1.2, 0.8, 0.3, 1.0] + rng.normal(0, 0.006, (len(dates), 4)), axis=0), index=dates, columns=TICKERS)
+    infos = {'AAA': {'beta': 1.2, 'sector': 'Technology', 'trailingPE': 30}, 'BBB': {'beta': 0.8, 'sector': 'Energy', 'dividendYield': 0.04}, 'CCC': {'beta': 0.3, 'sector': 'Utilities', 'dividendYield': 0.03}, 'SPY': {'beta': 1.0}}
+    provider = LocalProvider(prices, infos)
+    monkeypatch.setattr(async_fetcher, '_provider', provider)
+    monkeypatch.setattr(price_cache, '_price_cache', price_cache.PriceCache(as_price_source(provider), str(tmp_path)))
+    monkeypatch.setattr(metadata_cache, '_metadata_cache', metadata_cache.MetadataCache(str(tmp_path)))
+    monkeypatch.setattr(report_generator, 'REPORTS_DIR', str(tmp_path / 'reports'))
+    return prices
@@ -0,0 +1,85 @@
+import asyncio
+import types
+
+import pandas as pd
+import pytest
+
+from financial_portfolio_manager_analyzer import data_fetcher
+from financial_portfolio_manager_analyzer.async_fetcher import FetchError, LocalProvider, NoDataError, as_price_source, fetch_prices_async, run_sync
+
+
+class TzMissing(Exception):
+    pass
+
+
+class PricesMissing(Exception):
+    pass
+
+
+def _fake_yfinance(history):
+    """
+    Stand-in for the yfinance module whose Ticker(t).history(...) calls `history(t)`.
+    """
+    ticker = lambda symbol: types.SimpleNamespace(history=lambda **kwargs: history(symbol))
+    return types.SimpleNamespace(Ticker=ticker, exceptions=types.SimpleNamespace(YFTzMissingError=TzMissing, YFPricesMissingError=PricesMissing))
+
+
+def _history(symbol):
+    if symbol == 'UNKNOWN':
+        raise TzMissing(f"${symbol}: possibly delisted; no timezone found")
+    if symbol == 'DOWN':
+        raise ConnectionError("Connection reset by peer")
+    if symbol == 'EMPTY':
+        return pd.DataFrame(columns=['Close', 'Adj Close'])
+    index = pd.date_range('2024-01-02', periods=3, tz='Asia/Tokyo', name='Date')
+    return pd.DataFrame({'Close': [10.0, 11.0, 12.0], 'Adj Close': [9.0, 10.0, 11.0]}, index=index)
+
+
+def test_yfinance_provider_classifies_errors(monkeypatch):
+    monkeypatch.setattr(data_fetcher, '_yfinance', lambda: _fake_yfinance(_history))
+    provider = data_fetcher.YFinanceProvider()
+    prices = provider.prices('AAA', '2024-01-01', '2024-02-01')
+    assert prices.tolist() == [9.0, 10.0, 11.0]
+    assert prices.name == 'AAA'
+    assert list(prices.index) == list(pd.date_range('2024-01-02', periods=3))
+    for symbol in ['UNKNOWN', 'EMPTY']:
+        with pytest.raises(NoDataError):
+            provider.prices(symbol, '2024-01-01', '2024-02-01')
+    with pytest.raises(FetchError) as error:
+        provider.prices('DOWN', '2024-01-01', '2024-02-01')
+    assert not isinstance(error.value, NoDataError)
+
+
+def test_failures_are_retried_but_missing_symbols_are_not(monkeypatch):
+    calls = []
+
+    def flaky(symbol):
+        calls.append(symbol)
+        if symbol == 'AAA' and calls.count('AAA') < 3:
+            raise ConnectionError("Too many requests")
+        return _history(symbol)
+
+    monkeypatch.setattr(data_fetcher, '_yfinance', lambda: _fake_yfinance(flaky))
+    source = as_price_source(data_fetcher.YFinanceProvider(), retries=3, backoff=0)
+    frame = source(['AAA', 'UNKNOWN'], '2024-01-01', '2024-02-01')
+    assert list(frame.columns) == ['AAA']
+    assert calls.count('AAA') == 3
+    assert calls.count('UNKNOWN') == 1
+
+
+def test_source_raises_when_every_ticker_fails(monkeypatch):
+    monkeypatch.setattr(data_fetcher, '_yfinance', lambda: _fake_yfinance(_history))
+    source = as_price_source(data_fetcher.YFinanceProvider(), retries=1, backoff=0)
+    with pytest.raises(FetchError):
+        source(['DOWN'], '2024-01-01', '2024-02-01')
+    assert source(['UNKNOWN'], '2024-01-01', '2024-02-01').empty
+
+
+def test_run_sync_inside_running_event_loop():
+    provider = LocalProvider(pd.DataFrame({'AAA': [1.0, 2.0]}, index=pd.date_range('2024-01-02', periods=2)))
+
+    async def caller():
+        return run_sync(fetch_prices_async(['AAA'], '2024-01-01', '2024-02-01', provider))
+
+    results = asyncio.run(caller())
+    assert results['AAA'].ok and results['AAA'].value.tolist() == [1.0, 2.0]
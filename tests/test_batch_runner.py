@@ -0,0 +1,41 @@
+import json
+
+from financial_portfolio_manager_analyzer.batch_runner import _run_client, load_clients
+
+
+def test_malformed_records_become_failed_clients(tmp_path):
+    path = tmp_path / 'clients.csv'
+    path.write_text(
+        "name,assets,weights,risk_tolerance,goals\n"
+        "Ann Lee,\"AAPL,MSFT\",0.5;0.5,5,retirement\n"
+        "Zed,AAPL,abc,5,retirement\n"
+        ",AAPL,1,,growth\n"
+    )
+    clients = load_clients(str(path))
+    assert clients[0] == {'name': 'Ann Lee', 'assets': ['AAPL', 'MSFT'], 'weights': [0.5, 0.5], 'risk_tolerance': 5, 'goals': 'retirement'}
+    assert [client['name'] for client in clients[1:]] == ['Zed', 'record 3']
+    assert "could not convert string to float: 'abc'" in clients[1]['error']
+
+    result = _run_client(clients[1], seed=1)
+    assert result['status'] == 'failed'
+    assert result['error'].startswith("ValueError: Malformed client record 2")
+
+
+def test_json_record_missing_a_field(tmp_path):
+    path = tmp_path / 'clients.json'
+    path.write_text(json.dumps([{'name': 'Bob', 'assets': ['AAPL'], 'weights': [1], 'goals': 'growth'}]))
+    clients = load_clients(str(path))
+    assert clients == [{'name': 'Bob', 'error': "Malformed client record 1: missing field 'risk_tolerance'"}]
+
+
+def test_summary_records_seed_that_reproduces_report(local_source):
+    client = {'name': 'Ann', 'assets': ['AAA', 'BBB'], 'weights': [0.6, 0.4], 'risk_tolerance': 5, 'goals': 'retirement'}
+    first = _run_client(client, include_charts=False)
+    assert first['status'] == 'ok' and isinstance(first['seed'], int)
+    with open(first['report_path']) as f:
+        report = f.read()
+    assert f"<strong>Random Seed:</strong> {first['seed']}" in report
+
+    second = _run_client(client, seed=first['seed'], include_charts=False)
+    with open(second['report_path']) as f:
+        assert f.read() == report
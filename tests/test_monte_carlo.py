@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from financial_portfolio_manager_analyzer.monte_carlo import run_monte_carlo, summarize_simulation
+from financial_portfolio_manager_analyzer.pipeline import run_analysis
+
+MEAN = np.array([0.0004, 0.0002, 0.0003])
+COV = np.array([[1.0, 0.3, 0.1], [0.3, 0.5, 0.05], [0.1, 0.05, 0.8]]) * 1e-4
+WEIGHTS = [0.5, 0.3, 0.2]
+
+
+def test_same_seed_same_values_with_and_without_workers():
+    serial, entropy = run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=2500, num_days=50, seed=1234, chunk_size=400)
+    parallel, _ = run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=2500, num_days=50, seed=1234, chunk_size=400, workers=3)
+    assert entropy == 1234
+    assert len(serial) == 2500
+    np.testing.assert_array_equal(serial, parallel)
+    again, _ = run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=2500, num_days=50, seed=1234, chunk_size=400)
+    np.testing.assert_array_equal(serial, again)
+    other, _ = run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=2500, num_days=50, seed=1235, chunk_size=400)
+    assert not np.array_equal(serial, other)
+
+
+def test_unseeded_run_reports_a_reproducible_seed():
+    values, entropy = run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=300, num_days=20)
+    np.testing.assert_array_equal(values, run_monte_carlo(MEAN, COV, WEIGHTS, num_simulations=300, num_days=20, seed=entropy)[0])
+
+
+@pytest.mark.parametrize('confidence', [0.95, 0.99])
+def test_summary_matches_percentiles(confidence):
+    final_values = np.random.default_rng(0).lognormal(0.05, 0.2, 10000)
+    summary = summarize_simulation(final_values, confidence=confidence)
+    cutoff = np.percentile(final_values, (1 - confidence) * 100)
+    assert summary['var'] == pytest.approx(1 - cutoff)
+    assert summary['cvar'] == pytest.approx(1 - final_values[final_values <= cutoff].mean())
+    assert summary['cvar'] >= summary['var']
+    assert summary['percentiles'][50] == pytest.approx(np.median(final_values))
+    assert summary['mean'] == pytest.approx(final_values.mean())
+
+
+def test_report_shows_seed(local_source):
+    path = run_analysis('Seed Check', ['AAA', 'BBB', 'CCC'], [0.4, 0.4, 0.2], 5, 'retirement', include_charts=False, seed=4242)
+    with open(path) as f:
+        report = f.read()
+    assert '<strong>Random Seed:</strong> 4242' in report
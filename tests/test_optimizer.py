@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_portfolio_manager_analyzer.optimizer import efficient_frontier, minimum_variance_weights, risk_parity_weights
+
+
+def _returns(num_assets=6, num_days=750, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, num_days)
+    returns = market[:, None] * rng.uniform(0.3, 1.5, num_assets) + rng.normal(0.0002, 0.01, (num_days, num_assets))
+    return pd.DataFrame(returns, columns=[f"A{i}" for i in range(num_assets)])
+
+
+def _moments(returns):
+    return returns.mean() * 252, returns.cov() * 252
+
+
+def _assert_kkt(cov, weights, max_weight, linear=None, tol=1e-8):
+    # Optimality of min w'Cw - linear'w over the capped simplex: the gradient is equal
+    # (to the budget multiplier) on free assets, no lower at zero and no higher at the cap.
+    gradient = 2 * cov @ weights - (0 if linear is None else linear)
+    at_lower = weights <= 1e-10
+    at_upper = weights >= max_weight - 1e-10
+    free = ~(at_lower | at_upper)
+    multiplier = gradient[free].mean()
+    scale = tol * max(1.0, np.abs(gradient).max())
+    assert np.abs(gradient[free] - multiplier).max(initial=0) <= scale
+    assert (gradient[at_lower] >= multiplier - scale).all()
+    assert (gradient[at_upper] <= multiplier + scale).all()
+
+
+def test_minimum_variance_satisfies_kkt():
+    _, cov = _moments(_returns())
+    weights = minimum_variance_weights(cov, max_weight=0.25).to_numpy()
+    assert weights.sum() == pytest.approx(1)
+    assert weights.min() >= 0 and weights.max() <= 0.25 + 1e-12
+    _assert_kkt(cov.to_numpy(), weights, 0.25)
+
+
+@pytest.mark.parametrize('max_weight', [None, 0.3])
+def test_frontier_matches_slsqp(max_weight):
+    optimize = pytest.importorskip('scipy.optimize')
+    mean, cov = _moments(_returns())
+    points, weights = efficient_frontier(mean, cov, num_points=15, max_weight=max_weight)
+    mean_values, cov_values = mean.to_numpy(), cov.to_numpy()
+    upper = max_weight or 1.0
+    for point in range(0, 15, 3):
+        target = points['expected_return'].iloc[point]
+        result = optimize.minimize(
+            lambda w: w @ cov_values @ w, np.full(len(mean), 1 / len(mean)), jac=lambda w: 2 * cov_values @ w,
+            bounds=[(0, upper)] * len(mean), method='SLSQP', options={'ftol': 1e-15, 'maxiter': 1000},
+            constraints=[{'type': 'eq', 'fun': lambda w: w.sum() - 1}, {'type': 'ineq', 'fun': lambda w: w @ mean_values - target}]
+        )
+        assert result.success
+        # No feasible portfolio with at least this return has lower volatility.
+        assert points['volatility'].iloc[point] <= np.sqrt(result.fun) + 1e-7
+        assert weights.iloc[point].sum() == pytest.approx(1)
+
+
+def test_zero_variance_asset():
+    returns = _returns(4)
+    returns['CASH'] = 0.0
+    mean, cov = _moments(returns)
+    assert minimum_variance_weights(cov)['CASH'] == pytest.approx(1)
+    capped = minimum_variance_weights(cov, max_weight=0.4)
+    assert capped['CASH'] == pytest.approx(0.4)
+    _assert_kkt(cov.to_numpy(), capped.to_numpy(), 0.4)
+
+    points, weights = efficient_frontier(mean, cov, num_points=10, max_weight=0.4)
+    assert np.isfinite(points[['expected_return', 'volatility']].to_numpy()).all()
+    assert np.allclose(weights.sum(axis=1), 1)
+
+    parity = risk_parity_weights(cov)
+    assert parity['CASH'] == 0
+    risky = parity.drop('CASH').to_numpy()
+    risky_cov = cov.drop(index='CASH', columns='CASH').to_numpy()
+    contributions = risky * (risky_cov @ risky)
+    assert np.allclose(contributions, contributions.mean(), rtol=1e-6)
+
+
+def test_singular_covariance_from_duplicate_asset():
+    returns = _returns(4)
+    returns['COPY'] = returns['A0']
+    mean, cov = _moments(returns)
+    weights = minimum_variance_weights(cov, max_weight=0.3).to_numpy()
+    assert weights.sum() == pytest.approx(1)
+    _assert_kkt(cov.to_numpy(), weights, 0.3)
+    points, frontier_weights = efficient_frontier(mean, cov, num_points=10, max_weight=0.3)
+    assert np.isfinite(points[['expected_return', 'volatility']].to_numpy()).all()
+    assert np.allclose(frontier_weights.sum(axis=1), 1)
+    assert np.isfinite(risk_parity_weights(cov).to_numpy()).all()
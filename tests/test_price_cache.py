@@ -0,0 +1,119 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_portfolio_manager_analyzer.async_fetcher import LocalProvider, as_price_source
+from financial_portfolio_manager_analyzer.price_cache import PriceCache
+
+START = datetime.date(2024, 1, 1)
+
+
+class RecordingProvider(LocalProvider):
+    """
+    LocalProvider that records the (ticker, start_date) of every price request.
+    """
+
+    def __init__(self, prices, **options):
+        super().__init__(prices, **options)
+        self.calls = []
+
+    def prices(self, ticker, start_date, end_date):
+        self.calls.append((ticker, pd.Timestamp(start_date).date()))
+        return super().prices(ticker, start_date, end_date)
+
+
+@pytest.fixture
+def prices():
+    dates = pd.bdate_range('2024-01-01', '2024-03-29')
+    rng = np.random.default_rng(0)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (len(dates), 2)), axis=0)
+    return pd.DataFrame(values, index=dates, columns=['A', 'B'])
+
+
+def _cache(provider, directory, ttl=0):
+    return PriceCache(as_price_source(provider, retries=0, backoff=0), str(directory), ttl=ttl)
+
+
+def _expected(prices, end_date, columns=('A', 'B')):
+    expected = prices.loc[prices.index < pd.Timestamp(end_date), list(columns)]
+    expected.index = pd.DatetimeIndex(expected.index.values, name='Date')
+    return expected
+
+
+def _assert_prices(actual, expected):
+    # The index resolution (days vs. pandas' default) is not part of the contract.
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False, check_index_type=False)
+
+
+def test_full_miss_then_hit(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path, ttl=3600)
+    end_date = datetime.date(2024, 2, 1)
+    first = cache.get_prices(['A', 'B', 'UNKNOWN'], START, end_date)
+    _assert_prices(first, _expected(prices, end_date))
+    assert sorted(ticker for ticker, _ in provider.calls) == ['A', 'B', 'UNKNOWN']
+
+    provider.calls.clear()
+    _assert_prices(cache.get_prices(['A', 'B'], START, end_date), first)
+    assert provider.calls == []
+
+
+def test_tail_refresh_starts_at_last_stored_date(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path)
+    cache.get_prices(['A', 'B'], START, datetime.date(2024, 2, 1))
+    provider.calls.clear()
+    end_date = datetime.date(2024, 3, 1)
+    refreshed = cache.get_prices(['A', 'B'], START, end_date)
+    _assert_prices(refreshed, _expected(prices, end_date))
+    assert sorted(provider.calls) == [('A', datetime.date(2024, 1, 31)), ('B', datetime.date(2024, 1, 31))]
+
+
+def test_fresh_data_is_not_refreshed_within_ttl(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path, ttl=3600)
+    cache.get_prices(['A'], START, datetime.date(2024, 2, 1))
+    provider.calls.clear()
+    served = cache.get_prices(['A'], START, datetime.date(2024, 3, 1))
+    assert provider.calls == []
+    _assert_prices(served, _expected(prices, datetime.date(2024, 2, 1), ['A']))
+
+
+def test_failed_tail_serves_cached_prices(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path)
+    cache.get_prices(['A'], START, datetime.date(2024, 2, 1))
+    provider.failures = {'A': 1}
+    served = cache.get_prices(['A'], START, datetime.date(2024, 3, 1))
+    _assert_prices(served, _expected(prices, datetime.date(2024, 2, 1), ['A']))
+    # The failed days are fetched on the next call.
+    _assert_prices(cache.get_prices(['A'], START, datetime.date(2024, 3, 1)), _expected(prices, datetime.date(2024, 3, 1), ['A']))
+
+
+def test_empty_tail_leaves_no_gap(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path)
+    cache.get_prices(['A'], START, datetime.date(2024, 1, 15))
+    end_date = datetime.date(2024, 2, 15)
+    for available_until in ['2024-01-05', '2024-01-12']:
+        # Nothing new (or only the last stored day) comes back.
+        provider.prices_frame = prices.loc[:available_until]
+        served = cache.get_prices(['A'], START, end_date)
+        _assert_prices(served, _expected(prices, datetime.date(2024, 1, 15), ['A']))
+    provider.prices_frame = prices
+    _assert_prices(cache.get_prices(['A'], START, end_date), _expected(prices, end_date, ['A']))
+
+
+def test_rescaled_history_is_fetched_again(prices, tmp_path):
+    provider = RecordingProvider(prices)
+    cache = _cache(provider, tmp_path)
+    cache.get_prices(['A', 'B'], START, datetime.date(2024, 2, 1))
+    # A's adjusted history is rescaled 10:1, as after a split; B's is unchanged.
+    rescaled = prices.assign(A=prices['A'] / 10)
+    provider.prices_frame = rescaled
+    end_date = datetime.date(2024, 3, 1)
+    refreshed = cache.get_prices(['A', 'B'], START, end_date)
+    _assert_prices(refreshed, _expected(rescaled, end_date))
+    assert refreshed.pct_change().abs().max().max() < 0.1
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_portfolio_manager_analyzer.analysis_context import AnalysisContext
+from financial_portfolio_manager_analyzer.price_panel import PricePanel, nearest_psd
+
+
+def _gappy_returns(num_days=300, num_assets=5, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, (num_days, num_assets)) + rng.normal(0, 0.01, (num_days, 1))
+    frame = pd.DataFrame(returns, index=pd.bdate_range('2020-01-01', periods=num_days), columns=[f"A{i}" for i in range(num_assets)])
+    frame.iloc[:120, 1] = np.nan
+    frame.iloc[200:240, 2] = np.nan
+    frame.iloc[rng.choice(num_days, 30, replace=False), 3] = np.nan
+    frame.iloc[:, 4] = np.nan
+    frame.iloc[10, 4] = 0.01
+    return frame
+
+
+def _inconsistent_returns():
+    # A and B move together, B and C together, A and C opposite: never all on the same days.
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 0.01, (3, 50))
+    nan = np.full(50, np.nan)
+    values = np.vstack([
+        np.column_stack([x[0], x[0], nan]),
+        np.column_stack([nan, x[1], x[1]]),
+        np.column_stack([x[2], nan, -x[2]])
+    ])
+    return pd.DataFrame(values, index=pd.bdate_range('2020-01-01', periods=150), columns=['A', 'B', 'C'])
+
+
+@pytest.mark.parametrize('dtype, block_rows, rtol', [(np.float64, 1024, 1e-10), (np.float64, 7, 1e-10), (np.float32, 16, 1e-4)])
+def test_matches_dataframe_statistics(dtype, block_rows, rtol):
+    frame = _gappy_returns()
+    panel = PricePanel.from_frame(frame, dtype=dtype, block_rows=block_rows)
+    expected = frame.astype(dtype).astype(np.float64)
+    pd.testing.assert_series_equal(panel.count(), expected.count(), check_dtype=False)
+    pd.testing.assert_series_equal(panel.mean(), expected.mean(), rtol=rtol)
+    pd.testing.assert_frame_equal(panel.cov(), expected.cov(), rtol=rtol)
+    pd.testing.assert_frame_equal(panel.corr(), expected.corr(), rtol=rtol)
+    pd.testing.assert_frame_equal(panel.cov(min_periods=200), expected.cov(min_periods=200), rtol=rtol)
+
+
+def test_returns_match_pct_change():
+    prices = (1 + _gappy_returns().fillna(0)).cumprod()
+    prices.iloc[50:60, 0] = np.nan
+    returns = PricePanel.from_frame(prices).returns().to_frame()
+    expected = prices.pct_change(fill_method=None).iloc[1:]
+    pd.testing.assert_frame_equal(returns, expected, check_freq=False)
+
+
+def test_psd_repair():
+    panel = PricePanel.from_frame(_inconsistent_returns())
+    assert np.linalg.eigvalsh(panel.cov().to_numpy()).min() < 0
+    covariance = panel.cov(psd=True).to_numpy()
+    assert np.allclose(covariance, covariance.T)
+    assert np.linalg.eigvalsh(covariance).min() >= -1e-15
+    correlation = panel.corr(psd=True).to_numpy()
+    assert np.allclose(np.diag(correlation), 1)
+    assert np.abs(correlation).max() <= 1
+    # A PSD matrix is left as it is.
+    consistent = PricePanel.from_frame(_gappy_returns().iloc[:, :4].dropna()).cov()
+    np.testing.assert_allclose(nearest_psd(consistent), consistent.to_numpy())
+
+
+def test_psd_repair_keeps_assets_without_variance_missing():
+    covariance = np.array([[1.0, 0.5, np.nan], [0.5, 1.0, np.nan], [np.nan, np.nan, np.nan]])
+    repaired = nearest_psd(covariance)
+    np.testing.assert_allclose(repaired[:2, :2], covariance[:2, :2])
+    assert np.isnan(repaired[2]).all()
+
+
+def test_context_from_panel_uses_repaired_covariance():
+    prices = 100 * (1 + _inconsistent_returns().fillna(0)).cumprod()
+    prices[_inconsistent_returns().isna()] = np.nan
+    context = AnalysisContext(PricePanel.from_frame(prices))
+    assert np.linalg.eigvalsh(context.cov_matrix.to_numpy()).min() >= -1e-15
+    weights = np.array([0.2, 0.3, 0.5])
+    assert weights @ context.cov_matrix.to_numpy() @ weights >= 0
+    assert context.coverage['pairwise']
+    assert context.coverage['common_days'] == len(context.returns)
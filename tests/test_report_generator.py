@@ -0,0 +1,16 @@
+from financial_portfolio_manager_analyzer import report_generator
+from financial_portfolio_manager_analyzer.pipeline import run_analysis
+
+
+def _report(assets):
+    path = run_analysis('Table Check', assets, [1 / len(assets)] * len(assets), 5, 'retirement', include_charts=False, seed=1)
+    with open(path) as f:
+        return f.read()
+
+
+def test_correlation_table_only_up_to_the_cutoff(local_source, monkeypatch):
+    assert '<table border="1" class="dataframe">' in _report(['AAA', 'BBB', 'CCC'])
+    monkeypatch.setattr(report_generator, 'CORRELATION_TABLE_MAX_ASSETS', 2)
+    report = _report(['AAA', 'BBB', 'CCC'])
+    assert 'class="dataframe"' not in report
+    assert 'The correlation table is omitted for 3 assets.' in report